@@ -1,10 +1,22 @@
 'use client';
 
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import './globals.css';
 import ArticleCard from '../components/ArticleCard';
 import Sidebar from '../components/Sidebar';
 
+// Map scraper JSON articles to the card format
+const toCards = (items) => items.map((item, index) => ({
+  id: `article_${index + 1}`,
+  num: index + 1,
+  title: item.title,
+  source: item.source,
+  published: item.published_date || 'Unknown',
+  url: item.url,
+  summary: item.perplexity_summary || item.summary || 'No summary available',
+  score: item.perplexity_score ?? 5
+}));
+
 export default function Home() {
   const [articles, setArticles] = useState([]);
   const [likes, setLikes] = useState({});
@@ -13,6 +25,7 @@ export default function Home() {
   const [loading, setLoading] = useState(true);
   const [fileUsed, setFileUsed] = useState('');
   const [error, setError] = useState(null);
+  const snapshot = useRef({ version: null, items: [] });
 
   // Embedded fallback data - EXACT COPY from your Streamlit
   const FALLBACK_DATA = `HYBRID TECH NEWS SCRAPER RESULTS - 2025-10-09 21:09:52
@@ -158,15 +171,37 @@ const parseArticles = useCallback((content) => {
     return { content, usedFile };
   }, [FALLBACK_DATA]);
 
+  // Load structured JSON output - no text parsing needed
+  const loadNewsFromJson = useCallback(async () => {
+    try {
+      const response = await fetch('/hybrid_tech_news.json', { cache: 'no-store' });
+      if (!response.ok) return null;
+      const data = await response.json();
+      const items = data.articles || [];
+      // Version comes from the same file as the items, so the pair can't straddle two cycles
+      snapshot.current = { version: (data.cycle && data.cycle.version) || null, items };
+      return toCards(items);
+    } catch (e) {
+      console.error('Error reading hybrid_tech_news.json:', e);
+      return null;
+    }
+  }, []);
+
   // Load articles on mount
   useEffect(() => {
     const loadArticles = async () => {
       try {
         setLoading(true);
-        const { content, usedFile } = await loadNewsFromFile();
-        const parsedArticles = parseArticles(content);
-        setArticles(parsedArticles);
-        setFileUsed(usedFile);
+        const jsonArticles = await loadNewsFromJson();
+        if (jsonArticles) {
+          setArticles(jsonArticles);
+          setFileUsed('hybrid_tech_news.json');
+        } else {
+          const { content, usedFile } = await loadNewsFromFile();
+          const parsedArticles = parseArticles(content);
+          setArticles(parsedArticles);
+          setFileUsed(usedFile);
+        }
         setLoading(false);
       } catch (err) {
         setError('Failed to load articles');
@@ -175,7 +210,46 @@ const parseArticles = useCallback((content) => {
     };
 
     loadArticles();
-  }, [loadNewsFromFile, parseArticles]);
+  }, [loadNewsFromJson, loadNewsFromFile, parseArticles]);
+
+  // Poll the small version file; apply the cycle delta instead of re-downloading everything
+  useEffect(() => {
+    const POLL_MS = 5 * 60 * 1000;
+    const poll = async () => {
+      if (!snapshot.current.version) return;
+      try {
+        const response = await fetch('/hybrid_tech_news.version.json', { cache: 'no-store' });
+        if (!response.ok) return;
+        const manifest = await response.json();
+        if (manifest.version === snapshot.current.version) return;
+
+        const deltaResponse = await fetch('/hybrid_tech_news.delta.json', { cache: 'no-store' });
+        const delta = deltaResponse.ok ? await deltaResponse.json() : null;
+        if (!delta || delta.from_version !== snapshot.current.version || delta.to_version !== manifest.version) {
+          const jsonArticles = await loadNewsFromJson();
+          if (jsonArticles) setArticles(jsonArticles);
+          return;
+        }
+
+        const removed = new Set(delta.removed);
+        const updated = new Map((delta.updated || []).map(item => [item.url, item]));
+        const rescored = new Map(delta.rescored.map(r => [r.url, r.score]));
+        const items = snapshot.current.items
+          .filter(item => !removed.has(item.url))
+          .map(item => updated.get(item.url) || item)
+          .map(item => rescored.has(item.url) ? { ...item, perplexity_score: rescored.get(item.url) } : item)
+          .concat(delta.added)
+          .sort((a, b) => (b.perplexity_score ?? 5) - (a.perplexity_score ?? 5));
+        snapshot.current = { version: manifest.version, items };
+        setArticles(toCards(items));
+      } catch (e) {
+        console.error('Error polling for updates:', e);
+      }
+    };
+
+    const timer = setInterval(poll, POLL_MS);
+    return () => clearInterval(timer);
+  }, [loadNewsFromJson]);
 
   // Handle like
   const handleLike = useCallback((articleId) => {
@@ -1,15 +1,70 @@
-import feedparser
-import requests
+import io
+import cProfile
+import pstats
 import json
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import re
-import schedule
 import os
+import sys
+import random
+import hashlib
+import importlib
+import sqlite3
+import zlib
+import gzip
+import tempfile
+import threading
+import heapq
+import queue
+import argparse
+import socket
+import glob
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from email.utils import parsedate_to_datetime
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
 import logging
 
+class LazyModule:
+    """Module proxy that imports on first use, so a run only pays for the stages it reaches"""
+    
+    def __init__(self, name, optional=False):
+        self._name = name
+        self._optional = optional
+        self._module = None
+        self._missing = False
+    
+    def _load(self):
+        if self._module is None and not self._missing:
+            try:
+                self._module = importlib.import_module(self._name)
+            except ImportError:
+                if not self._optional:
+                    raise
+                self._missing = True
+        return self._module
+    
+    def __bool__(self):
+        """False when an optional module isn't installed"""
+        return self._load() is not None
+    
+    def __getattr__(self, attr):
+        module = self._load()
+        if module is None:
+            raise AttributeError(f"optional module '{self._name}' is not installed")
+        return getattr(module, attr)
+
+feedparser = LazyModule('feedparser')
+requests = LazyModule('requests')
+schedule = LazyModule('schedule')
+bs4 = LazyModule('bs4')
+multiprocessing = LazyModule('multiprocessing')
+np = LazyModule('numpy', optional=True)  # only speeds up dedup signatures and enables the local model
+lxml_html = LazyModule('lxml.html', optional=True)  # extraction falls back to BeautifulSoup's html.parser
+brotli = LazyModule('brotli', optional=True)  # snapshots are then only precompressed with gzip
+
 # Suppress unnecessary warnings
 logging.getLogger('requests').setLevel(logging.WARNING)
 logging.getLogger('urllib3').setLevel(logging.WARNING)
@@ -18,11 +73,1583 @@ logging.getLogger('urllib3').setLevel(logging.WARNING)
 load_dotenv()
 PERPLEXITY_API_KEY = os.getenv('PERPLEXITY_API_KEY')
 
-class HybridNewsScraper:
+# Concurrency settings (set SCRAPER_CONCURRENT=0 to process one feed at a time)
+CONCURRENT_FETCH = os.getenv('SCRAPER_CONCURRENT', '1') != '0'
+MAX_WORKERS = int(os.getenv('SCRAPER_MAX_WORKERS', '16'))
+PER_HOST_LIMIT = int(os.getenv('SCRAPER_PER_HOST_LIMIT', '2'))
+
+# HTTP client: retries, per-host pacing and feed circuit breakers
+HTTP_RETRIES = int(os.getenv('SCRAPER_HTTP_RETRIES', '2'))
+HOST_RATE_PER_SEC = float(os.getenv('SCRAPER_HOST_RATE', '2'))
+HOST_BURST = int(os.getenv('SCRAPER_HOST_BURST', '3'))
+BREAKER_FAILURES = int(os.getenv('SCRAPER_BREAKER_FAILURES', '3'))
+BREAKER_COOLDOWN_MINUTES = float(os.getenv('SCRAPER_BREAKER_COOLDOWN_MINUTES', '60'))
+
+# On-disk cache for feeds and article pages (set SCRAPER_HTTP_CACHE=0 to disable)
+CACHE_DIR = os.getenv('SCRAPER_CACHE_DIR', '.scraper_cache')
+HTTP_CACHE_ENABLED = os.getenv('SCRAPER_HTTP_CACHE', '1') != '0'
+HTTP_CACHE_MAX_DAYS = float(os.getenv('SCRAPER_HTTP_CACHE_DAYS', '7'))
+HTTP_CACHE_MAX_MB = float(os.getenv('SCRAPER_HTTP_CACHE_MB', '500'))
+
+# Streaming pipeline: stages linked by bounded queues (SCRAPER_PIPELINE=0 runs phase by phase)
+PIPELINE_ENABLED = os.getenv('SCRAPER_PIPELINE', '1') != '0'
+PIPELINE_QUEUE_SIZE = int(os.getenv('SCRAPER_PIPELINE_QUEUE_SIZE', '100'))
+PIPELINE_BATCH_WAIT = float(os.getenv('SCRAPER_PIPELINE_BATCH_WAIT', '0.5'))
+MAX_OUTPUT_ARTICLES = 50
+
+# Article content held in memory per cycle before spilling to a temp file (0 = no limit)
+MEMORY_BUDGET_MB = float(os.getenv('SCRAPER_MEMORY_BUDGET_MB', '0'))
+
+# Scheduling: 'adaptive' polls each feed on its own interval, 'fixed' re-runs everything every 2 hours
+SCHEDULER_MODE = os.getenv('SCRAPER_SCHEDULER', 'adaptive')
+MIN_POLL_MINUTES = float(os.getenv('SCRAPER_MIN_POLL_MINUTES', '10'))
+MAX_POLL_MINUTES = float(os.getenv('SCRAPER_MAX_POLL_MINUTES', '360'))
+DEFAULT_POLL_MINUTES = 120
+API_POLL_MINUTES = float(os.getenv('SCRAPER_API_POLL_MINUTES', '120'))
+
+# Sharding: split feeds across worker processes, or hosts sharing SHARD_DIR
+SHARD_COUNT = int(os.getenv('SCRAPER_SHARDS', '1'))
+SHARD_DIR = os.getenv('SCRAPER_SHARD_DIR', os.path.join(CACHE_DIR, 'shards'))
+SHARD_LEASE_MINUTES = float(os.getenv('SCRAPER_SHARD_LEASE_MINUTES', '30'))
+SHARD_MAX_ATTEMPTS = int(os.getenv('SCRAPER_SHARD_MAX_ATTEMPTS', '3'))
+
+# Output files written to public/ each cycle ('txt' is the legacy format)
+OUTPUT_FORMATS = [f.strip() for f in os.getenv('SCRAPER_OUTPUT_FORMATS', 'txt,json').split(',') if f.strip()]
+
+# Precompressed copies (.gz/.br) of every output file plus a version file and per-cycle delta
+SNAPSHOTS_ENABLED = os.getenv('SCRAPER_SNAPSHOTS', '1') != '0'
+SNAPSHOT_INDEX_PATH = os.path.join(CACHE_DIR, 'snapshot_index.json')
+
+# Per-cycle metrics (Prometheus textfile + JSON) and optional cProfile dumps
+METRICS_DIR = os.getenv('SCRAPER_METRICS_DIR', 'metrics')
+PROFILE_ENABLED = os.getenv('SCRAPER_PROFILE', '0') != '0'
+
+# Incremental processing: skip articles already extracted/scored in earlier cycles
+INCREMENTAL_ENABLED = os.getenv('SCRAPER_INCREMENTAL', '1') != '0'
+STORE_PATH = os.path.join(CACHE_DIR, 'articles.db')
+SQLITE_TIMEOUT = 30  # seconds to wait on a locked database (shard workers share it)
+MERGE_WINDOW_HOURS = float(os.getenv('SCRAPER_MERGE_HOURS', '24'))
+STORE_RETENTION_DAYS = float(os.getenv('SCRAPER_STORE_RETENTION_DAYS', '14'))
+
+# Searchable history of every scored article (0 days = keep forever)
+HISTORY_ENABLED = os.getenv('SCRAPER_HISTORY', '1') != '0'
+HISTORY_RETENTION_DAYS = float(os.getenv('SCRAPER_HISTORY_RETENTION_DAYS', '0'))
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+
+# Perplexity enrichment (batch size 1 = one request per article)
+ENRICH_BATCH_SIZE = int(os.getenv('SCRAPER_ENRICH_BATCH_SIZE', '10'))
+ENRICH_CONCURRENCY = int(os.getenv('SCRAPER_ENRICH_CONCURRENCY', '3'))
+ENRICH_RATE_PER_MIN = float(os.getenv('SCRAPER_ENRICH_RATE_PER_MIN', '30'))
+ENRICH_CACHE_ENABLED = os.getenv('SCRAPER_ENRICH_CACHE', '1') != '0'
+
+# Local relevance model: confident predictions skip Perplexity, the band in between is escalated
+LOCAL_MODEL_ENABLED = os.getenv('SCRAPER_LOCAL_MODEL', '1') != '0'
+LOCAL_MODEL_MIN_SAMPLES = int(os.getenv('SCRAPER_LOCAL_MODEL_MIN_SAMPLES', '200'))
+LOCAL_MODEL_LOW = float(os.getenv('SCRAPER_LOCAL_MODEL_LOW', '3.5'))
+LOCAL_MODEL_HIGH = float(os.getenv('SCRAPER_LOCAL_MODEL_HIGH', '7.5'))
+
+# Near-duplicate detection (0 hours = only dedup within the current cycle)
+DEDUP_HISTORY_HOURS = float(os.getenv('SCRAPER_DEDUP_HISTORY_HOURS', '24'))
+
+# Article extraction limits
+EXTRACT_MAX_BYTES = int(os.getenv('SCRAPER_EXTRACT_MAX_BYTES', str(512 * 1024)))
+EXTRACT_MAX_CHARS = 1000
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+CONTENT_SELECTORS = ['article', '.article-body', '.entry-content', 'main']
+CONTENT_XPATHS = [
+    '//article',
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' article-body ')]",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' entry-content ')]",
+    '//main',
+]
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+def atomic_write(path, data, mode=0o644):
+    """Write bytes via temp file + rename so readers never see a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def precompress(path, data):
+    """Write gzip (and brotli, if installed) copies of `data` next to `path`"""
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    atomic_write(path + '.gz', compressed)
+    written = {'gzip': len(compressed)}
+    if brotli:
+        compressed = brotli.compress(data, quality=11)
+        atomic_write(path + '.br', compressed)
+        written['br'] = len(compressed)
+    return written
+
+class CycleMetrics:
+    """Thread-safe timings and counters for one scraping cycle, by stage and source"""
+    
+    FETCH_STAGES = ('feed_fetch', 'api_fetch')
+    
     def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.stages = {}
+        self.counters = {}
+    
+    @contextmanager
+    def stage(self, name, source='all'):
+        """Time a block; exceptions are counted as errors and re-raised"""
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.record(name, source, time.perf_counter() - start, failed)
+    
+    def record(self, name, source, seconds, failed=False):
+        with self.lock:
+            stats = self.stages.setdefault((name, source), {'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            stats['calls'] += 1
+            stats['errors'] += int(failed)
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+    
+    def count(self, name, source='all', value=1):
+        with self.lock:
+            self.counters[(name, source)] = self.counters.get((name, source), 0) + value
+    
+    def fetch_stats(self):
+        """Source fetch stages and breaker skips only, in to_dict's shape, for passing between processes"""
+        data = self.to_dict()
+        data['stages'] = [s for s in data['stages'] if s['stage'] in self.FETCH_STAGES]
+        data['counters'] = [c for c in data['counters'] if c['name'] == 'feed_skipped']
+        return data
+    
+    def merge(self, data):
+        """Fold in stages and counters exported by another process's to_dict/fetch_stats"""
+        with self.lock:
+            for s in data.get('stages', []):
+                stats = self.stages.setdefault((s['stage'], s['source']), {'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+                stats['calls'] += s['calls']
+                stats['errors'] += s['errors']
+                stats['seconds'] += s['seconds']
+                stats['max_seconds'] = max(stats['max_seconds'], s['max_seconds'])
+            for c in data.get('counters', []):
+                self.counters[(c['name'], c['source'])] = self.counters.get((c['name'], c['source']), 0) + c['value']
+    
+    def sources_failed(self):
+        """True when sources were polled this cycle and not one feed or API search succeeded"""
+        with self.lock:
+            fetches = [stats for (name, _), stats in self.stages.items() if name in self.FETCH_STAGES]
+            skipped = any(name == 'feed_skipped' for name, _ in self.counters)
+        if not fetches and not skipped:
+            return False
+        return all(stats['errors'] == stats['calls'] for stats in fetches)
+    
+    def to_dict(self):
+        with self.lock:
+            return {
+                'started': datetime.fromtimestamp(self.started).isoformat(),
+                'duration_seconds': round(time.time() - self.started, 3),
+                'stages': [dict(stage=name, source=source, **stats) for (name, source), stats in sorted(self.stages.items())],
+                'counters': [{'name': name, 'source': source, 'value': value} for (name, source), value in sorted(self.counters.items())]
+            }
+    
+    def to_prometheus(self):
+        def labels(**pairs):
+            escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in pairs.items())
+            return '{' + ','.join(escaped) + '}'
+        
+        data = self.to_dict()
+        lines = [
+            '# HELP scraper_cycle_duration_seconds Wall time of the last scraping cycle',
+            '# TYPE scraper_cycle_duration_seconds gauge',
+            f"scraper_cycle_duration_seconds {data['duration_seconds']}",
+            '# HELP scraper_cycle_timestamp_seconds Start time of the last scraping cycle',
+            '# TYPE scraper_cycle_timestamp_seconds gauge',
+            f'scraper_cycle_timestamp_seconds {self.started:.0f}',
+        ]
+        # Gauges without a _total suffix: every value is reset at the start of a cycle
+        series = [
+            ('scraper_stage_seconds', 'Time spent in a stage during the last cycle', 'seconds'),
+            ('scraper_stage_max_seconds', 'Slowest single call of a stage', 'max_seconds'),
+            ('scraper_stage_calls', 'Number of calls of a stage during the last cycle', 'calls'),
+            ('scraper_stage_errors', 'Number of failed calls of a stage during the last cycle', 'errors'),
+        ]
+        for metric, help_text, key in series:
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} gauge')
+            for stage in data['stages']:
+                value = round(stage[key], 6) if isinstance(stage[key], float) else stage[key]
+                lines.append(f"{metric}{labels(stage=stage['stage'], source=stage['source'])} {value}")
+        lines.append('# HELP scraper_events Event counts for the last cycle')
+        lines.append('# TYPE scraper_events gauge')
+        for counter in data['counters']:
+            lines.append(f"scraper_events{labels(event=counter['name'], source=counter['source'])} {counter['value']}")
+        return '\n'.join(lines) + '\n'
+    
+    def export(self, metrics_dir):
+        """Write scraper_metrics.prom and scraper_metrics.json atomically"""
+        os.makedirs(metrics_dir, exist_ok=True)
+        atomic_write(os.path.join(metrics_dir, 'scraper_metrics.prom'), self.to_prometheus().encode('utf-8'))
+        atomic_write(os.path.join(metrics_dir, 'scraper_metrics.json'), json.dumps(self.to_dict(), indent=1).encode('utf-8'))
+
+class HttpCache:
+    """Disk-backed store of response bodies plus their ETag/Last-Modified validators"""
+    
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body'
+    
+    def get(self, url):
+        """Return (meta, body) for a cached URL, or (None, None)"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            return meta, body
+        except (OSError, ValueError):
+            return None, None
+    
+    def is_fresh(self, meta):
+        return bool(meta) and meta.get('expires', 0) > time.time()
+    
+    def conditional_headers(self, meta):
+        headers = {}
+        if meta and meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta and meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+    
+    def _expires(self, headers):
+        """Work out when a response goes stale from Cache-Control / Expires"""
+        cache_control = headers.get('Cache-Control', '').lower()
+        if 'no-store' in cache_control or 'no-cache' in cache_control:
+            return 0
+        
+        max_age = re.search(r'max-age=(\d+)', cache_control)
+        if max_age:
+            return time.time() + int(max_age[1])
+        
+        if headers.get('Expires'):
+            try:
+                return parsedate_to_datetime(headers['Expires']).timestamp()
+            except (TypeError, ValueError):
+                return 0
+        return 0
+    
+    def store(self, url, headers, body, content_type=''):
+        if 'no-store' in headers.get('Cache-Control', '').lower():
+            return
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'content_type': content_type,
+            'expires': self._expires(headers),
+            'fetched_at': time.time()
+        }
+        meta_path, body_path = self._paths(url)
+        atomic_write(body_path, body)
+        atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+    
+    def fresh_until(self, url):
+        """Expiry timestamp of a cached URL (0 if unknown)"""
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('expires', 0)
+        except (OSError, ValueError):
+            return 0
+    
+    def refresh(self, url, meta, headers):
+        """Update validators and freshness after a 304 Not Modified"""
+        meta = dict(meta)
+        meta['etag'] = headers.get('ETag') or meta.get('etag')
+        meta['last_modified'] = headers.get('Last-Modified') or meta.get('last_modified')
+        meta['expires'] = self._expires(headers)
+        meta['fetched_at'] = time.time()
+        meta_path, _ = self._paths(url)
+        atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+    
+    def prune(self, older_than, max_bytes=None):
+        """Drop entries fetched before `older_than`, then the oldest until under `max_bytes`"""
+        entries = []
+        for meta_path in glob.glob(os.path.join(self.cache_dir, '*.json')):
+            body_path = meta_path[:-len('.json')] + '.body'
+            try:
+                # The meta file is rewritten on every fetch and 304, so its mtime is fetched_at
+                stat = os.stat(meta_path)
+                fetched_at = stat.st_mtime
+                size = stat.st_size + (os.path.getsize(body_path) if os.path.exists(body_path) else 0)
+            except OSError:
+                fetched_at, size = 0, 0
+            entries.append((fetched_at, size, meta_path, body_path))
+        
+        entries.sort()
+        total = sum(size for _, size, _, _ in entries)
+        removed = 0
+        for fetched_at, size, meta_path, body_path in entries:
+            if fetched_at >= older_than and (not max_bytes or total <= max_bytes):
+                break
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+        return removed
+
+def normalize_url(url):
+    """Canonical form of an article URL (no tracking params, fragment or trailing slash)"""
+    parts = urlparse(url.strip())
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in ('fbclid', 'gclid', 'ref')
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urlunparse((parts.scheme.lower(), parts.netloc.lower(), path, '', urlencode(sorted(query)), ''))
+
+def content_hash(*parts):
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+class ContentSpill:
+    """Compressed article content, kept in memory up to a byte budget and in a temp file after that"""
+    
+    MIN_COMPRESS_CHARS = 200
+    
+    def __init__(self, budget_bytes=0):
+        self.budget = budget_bytes
+        self.in_memory = 0
+        self.file = None
+        self.lock = threading.Lock()
+    
+    def put(self, text):
+        """Handle for `text`: the string itself, zlib bytes, or an (offset, length) in the spill file"""
+        if len(text) < self.MIN_COMPRESS_CHARS:
+            return text
+        data = zlib.compress(text.encode('utf-8'))
+        with self.lock:
+            if not self.budget or self.in_memory + len(data) <= self.budget:
+                self.in_memory += len(data)
+                return data
+            if self.file is None:
+                self.file = tempfile.TemporaryFile(prefix='scraper-spill-')
+            self.file.seek(0, os.SEEK_END)
+            offset = self.file.tell()
+            self.file.write(data)
+            return (offset, len(data))
+    
+    def get(self, handle):
+        if isinstance(handle, str):
+            return handle
+        if isinstance(handle, tuple):
+            with self.lock:
+                self.file.seek(handle[0])
+                handle = self.file.read(handle[1])
+        return zlib.decompress(handle).decode('utf-8')
+    
+    def release(self, handle):
+        """Give an in-memory handle's bytes back to the budget once its article is dropped"""
+        if isinstance(handle, bytes):
+            with self.lock:
+                self.in_memory = max(0, self.in_memory - len(handle))
+    
+    def reset(self):
+        """Drop everything from the previous cycle"""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.in_memory = 0
+
+class Article:
+    """Compact article record with the dict interface the rest of the scraper uses.
+    
+    Slots instead of a per-article dict, interned source names, one shared
+    scrape_time string per cycle, and full_content held through a
+    ContentSpill (compressed, and on disk once the memory budget is used up).
+    Enrichment fields are only present once set, like missing dict keys.
+    """
+    
+    FIELDS = ('source', 'title', 'summary', 'full_content', 'url', 'published_date', 'scrape_time',
+              'perplexity_score', 'perplexity_summary')
+    __slots__ = ('source', 'title', 'summary', '_content', 'url', 'published_date', 'scrape_time',
+                 'perplexity_score', 'perplexity_summary', '_spill')
+    
+    def __init__(self, spill, source, title, summary, url, published_date, scrape_time, full_content='', **enrichment):
+        self._spill = spill
+        self.source = sys.intern(source)
+        self.title = title
+        self.summary = summary
+        self.url = url
+        self.published_date = published_date
+        self.scrape_time = scrape_time
+        self._content = spill.put(full_content or '')
+        for key, value in enrichment.items():
+            self[key] = value
+    
+    @classmethod
+    def from_dict(cls, data, spill):
+        """Rebuild a record from stored JSON, ignoring fields this version doesn't know"""
+        if isinstance(data, cls):
+            return data
+        fields = {k: v for k, v in data.items() if k in cls.FIELDS}
+        return cls(spill, **fields)
+    
+    def __getitem__(self, key):
+        if key == 'full_content':
+            return self._spill.get(self._content)
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def __setitem__(self, key, value):
+        if key == 'full_content':
+            self._spill.release(self._content)
+            self._content = self._spill.put(value or '')
+        elif key in self.FIELDS:
+            setattr(self, key, sys.intern(value) if key == 'source' else value)
+        else:
+            raise KeyError(key)
+    
+    def __contains__(self, key):
+        return key == 'full_content' or (key in self.FIELDS and hasattr(self, key))
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def update(self, values):
+        for key, value in values.items():
+            self[key] = value
+    
+    def release(self):
+        """Free the content's share of the memory budget; the record must not be used afterwards"""
+        self._spill.release(self._content)
+        self._content = ''
+    
+    def keys(self):
+        return [key for key in self.FIELDS if key in self]
+    
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def __repr__(self):
+        return f"Article({self.source!r}, {self.title[:40]!r})"
+
+class ProcessedArticleStore:
+    """SQLite record of articles that have already been extracted and scored"""
+    
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=SQLITE_TIMEOUT)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS processed_articles (
+                    url_key TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    article TEXT NOT NULL,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_processed_last_seen ON processed_articles (last_seen)"
+            )
+    
+    def get(self, url_key, digest):
+        """Return the stored article if it was processed with the same content"""
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT article FROM processed_articles WHERE url_key = ? AND content_hash = ?",
+                (url_key, digest)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE processed_articles SET last_seen = ? WHERE url_key = ?",
+                (time.time(), url_key)
+            )
+        return json.loads(row[0])
+    
+    def put(self, url_key, digest, article):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute("""
+                INSERT INTO processed_articles (url_key, content_hash, article, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url_key) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    article = excluded.article,
+                    last_seen = excluded.last_seen
+            """, (url_key, digest, json.dumps(dict(article)), now, now))
+    
+    def recent(self, since):
+        """Articles seen in a feed at or after the given timestamp"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT article FROM processed_articles WHERE last_seen >= ?", (since,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+    
+    def prune(self, older_than):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM processed_articles WHERE last_seen < ?", (older_than,))
+
+# Scoring keywords: high priority 3 points, medium 2, low 1
+HIGH_PRIORITY_KEYWORDS = [
+    'artificial intelligence', 'salesforce', 'crm', 'ai', 'machine learning',
+    'b2b', 'enterprise software', 'saas', 'automation', 'digital transformation'
+]
+MEDIUM_PRIORITY_KEYWORDS = [
+    'cloud computing', 'data analytics', 'cybersecurity', 'startup', 'funding',
+    'api', 'integration', 'business intelligence', 'venture capital', 'fintech'
+]
+LOW_PRIORITY_KEYWORDS = [
+    'technology', 'software', 'platform', 'innovation', 'developer',
+    'application', 'system', 'solution', 'product', 'service'
+]
+
+# Filtering keywords: tech/AI/Salesforce/B2B topics in, consumer noise out
+RELEVANT_KEYWORDS = [
+    'artificial intelligence', 'ai', 'machine learning', 'ml', 'deep learning',
+    'salesforce', 'crm', 'customer relationship', 'saas', 'software as a service',
+    'b2b', 'business to business', 'enterprise software', 'business intelligence',
+    'automation', 'digital transformation', 'cloud computing', 'api', 'integration',
+    'startup', 'fintech', 'martech', 'adtech', 'proptech', 'healthtech',
+    'venture capital', 'funding', 'ipo', 'acquisition', 'merger',
+    'cybersecurity', 'data analytics', 'big data', 'blockchain', 'cryptocurrency'
+]
+UNWANTED_KEYWORDS = [
+    'amazon prime', 'black friday', 'cyber monday', 'discount', 'sale', 'deal',
+    'iphone', 'samsung galaxy', 'playstation', 'xbox', 'nintendo',
+    'movie review', 'tv show', 'celebrity', 'sports', 'weather',
+    'recipe', 'fashion', 'beauty', 'travel deals', 'hotel booking'
+]
+
+def published_timestamp(value, fallback=None):
+    """Best-effort epoch seconds for an RFC 2822 or ISO date string"""
+    for parse in (parsedate_to_datetime, datetime.fromisoformat):
+        try:
+            parsed = parse(str(value).strip())
+        except (TypeError, ValueError, IndexError):
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return fallback
+
+class ArticleHistory:
+    """Every scored article, kept in SQLite with an FTS5 index for search.
+    
+    Articles are upserted by normalized URL, so re-scored stories replace
+    their earlier row. Text search uses FTS5 ranking where the SQLite build
+    has it and falls back to LIKE matching otherwise.
+    """
+    
+    COLUMNS = ('title', 'source', 'url', 'published_date', 'published', 'score', 'summary', 'content', 'scraped')
+    
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=SQLITE_TIMEOUT)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS article_history (
+                    id INTEGER PRIMARY KEY,
+                    url_key TEXT NOT NULL UNIQUE,
+                    title TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    published_date TEXT,
+                    published REAL NOT NULL,
+                    score INTEGER,
+                    summary TEXT,
+                    content TEXT,
+                    scraped REAL NOT NULL
+                )
+            """)
+            for column in ('source', 'published', 'score'):
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_history_{column} ON article_history ({column})"
+                )
+            self.fts = self._create_fts()
+    
+    def _create_fts(self):
+        try:
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS article_history_fts USING fts5(
+                    title, summary, content, content='article_history', content_rowid='id'
+                )
+            """)
+        except sqlite3.OperationalError:
+            return False
+        # External-content table: triggers keep the index in step with the rows
+        self.conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS article_history_ai AFTER INSERT ON article_history BEGIN
+                INSERT INTO article_history_fts (rowid, title, summary, content)
+                VALUES (new.id, new.title, new.summary, new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS article_history_ad AFTER DELETE ON article_history BEGIN
+                INSERT INTO article_history_fts (article_history_fts, rowid, title, summary, content)
+                VALUES ('delete', old.id, old.title, old.summary, old.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS article_history_au AFTER UPDATE ON article_history BEGIN
+                INSERT INTO article_history_fts (article_history_fts, rowid, title, summary, content)
+                VALUES ('delete', old.id, old.title, old.summary, old.content);
+                INSERT INTO article_history_fts (rowid, title, summary, content)
+                VALUES (new.id, new.title, new.summary, new.content);
+            END;
+        """)
+        return True
+    
+    def record(self, articles):
+        rows = []
+        for article in articles:
+            scraped = published_timestamp(article.get('scrape_time'), time.time())
+            rows.append((
+                normalize_url(article['url']),
+                article['title'],
+                article['source'],
+                article['url'],
+                article.get('published_date'),
+                published_timestamp(article.get('published_date'), scraped),
+                article.get('perplexity_score'),
+                article.get('perplexity_summary') or article.get('summary'),
+                article.get('full_content'),
+                scraped
+            ))
+        with self.lock, self.conn:
+            self.conn.executemany("""
+                INSERT INTO article_history
+                    (url_key, title, source, url, published_date, published, score, summary, content, scraped)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url_key) DO UPDATE SET
+                    title = excluded.title, source = excluded.source, url = excluded.url,
+                    published_date = excluded.published_date, published = excluded.published,
+                    score = excluded.score, summary = excluded.summary, content = excluded.content,
+                    scraped = excluded.scraped
+            """, rows)
+    
+    def query(self, text=None, source=None, since=None, until=None, min_score=None, max_score=None,
+              page=1, per_page=HISTORY_PAGE_SIZE):
+        """One page of matching articles, best match (or newest) first"""
+        page = max(1, int(page))
+        per_page = min(max(1, int(per_page)), HISTORY_MAX_PAGE_SIZE)
+        
+        source_table, order, where, params = "article_history h", "h.published DESC", [], []
+        if text and self.fts:
+            source_table = ("article_history h JOIN (SELECT rowid, bm25(article_history_fts) AS rank "
+                            "FROM article_history_fts WHERE article_history_fts MATCH ?) f ON f.rowid = h.id")
+            order = "f.rank, " + order
+            params.append(self._fts_query(text))
+        elif text:
+            for term in text.split():
+                where.append("(h.title LIKE ? OR h.summary LIKE ? OR h.content LIKE ?)")
+                params.extend([f"%{term}%"] * 3)
+        for clause, value in (("h.source = ?", source), ("h.published >= ?", since), ("h.published < ?", until),
+                              ("h.score >= ?", min_score), ("h.score <= ?", max_score)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        condition = f"WHERE {' AND '.join(where)}" if where else ""
+        
+        with self.lock:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM {source_table} {condition}", params).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT {', '.join('h.' + c for c in self.COLUMNS)} FROM {source_table} {condition} "
+                f"ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [per_page, (page - 1) * per_page]
+            ).fetchall()
+        return {
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': (total + per_page - 1) // per_page,
+            'articles': [dict(zip(self.COLUMNS, row)) for row in rows]
+        }
+    
+    @staticmethod
+    def _fts_query(text):
+        # Quote each word so user input can't inject FTS5 query syntax
+        return ' '.join('"' + word.replace('"', '""') + '"' for word in text.split())
+    
+    def prune(self, older_than):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM article_history WHERE scraped < ?", (older_than,))
+
+class KeywordMatcher:
+    """All scoring and filtering keywords compiled into one word-boundary regex.
+    
+    A single scan of the text yields both the weighted score and the
+    relevant/unwanted verdict. Matching is on whole words, so 'ai' no longer
+    fires on 'said' nor 'sale' on 'wholesale'. Scoring and relevant keywords
+    also match their plural ('startups', 'apis'); unwanted ones don't, so
+    'sales' isn't mistaken for 'sale'.
+    """
+    
+    def __init__(self, weights, relevant, unwanted):
+        self.weights = dict(weights)
+        self.relevant = set(relevant)
+        self.unwanted = set(unwanted)
+        self.pluralizable = set(self.weights) | self.relevant
+        
+        terms = sorted(set(self.weights) | self.relevant | self.unwanted, key=len, reverse=True)
+        alternation = '|'.join(re.escape(term).replace(r'\ ', r'\s+') for term in terms)
+        self.pattern = re.compile(rf'\b(?:{alternation})s?\b', re.IGNORECASE)
+    
+    def _term(self, matched):
+        matched = ' '.join(matched.lower().split())
+        if matched in self.weights or matched in self.relevant or matched in self.unwanted:
+            return matched
+        if matched.endswith('s') and matched[:-1] in self.pluralizable:
+            return matched[:-1]
+        return None
+    
+    def analyze(self, *texts):
+        """Return (score 1-10, is_relevant) for the given pieces of text"""
+        found = set()
+        for text in texts:
+            if text:
+                found.update(self._term(m.group(0)) for m in self.pattern.finditer(text))
+        found.discard(None)
+        
+        score = sum(self.weights.get(term, 0) for term in found)
+        is_relevant = not found.isdisjoint(self.relevant) and found.isdisjoint(self.unwanted)
+        return min(10, max(1, score)), is_relevant
+
+class EnrichmentCache:
+    """Perplexity results keyed by a hash of title+summary, shared by syndicated copies"""
+    
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=SQLITE_TIMEOUT)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS enrichment_cache (
+                    content_hash TEXT PRIMARY KEY,
+                    score INTEGER NOT NULL,
+                    summary TEXT NOT NULL,
+                    created REAL NOT NULL
+                )
+            """)
+    
+    def get_many(self, digests):
+        found = {}
+        with self.lock:
+            for digest in digests:
+                row = self.conn.execute(
+                    "SELECT score, summary FROM enrichment_cache WHERE content_hash = ?", (digest,)
+                ).fetchone()
+                if row:
+                    found[digest] = {'perplexity_score': row[0], 'perplexity_summary': row[1]}
+        return found
+    
+    def put_many(self, enhancements):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO enrichment_cache (content_hash, score, summary, created) VALUES (?, ?, ?, ?)",
+                [(digest, e['perplexity_score'], e['perplexity_summary'], now) for digest, e in enhancements.items()]
+            )
+
+class LocalRelevanceModel:
+    """Hashed bag-of-words ridge regression trained on past Perplexity scores.
+    
+    Title+summary words and word pairs are hashed into a fixed number of
+    buckets; each text only keeps its nonzero buckets (sparse rows), and the
+    linear model is solved with conjugate gradients over those entries, so
+    memory and time grow with the number of words rather than samples times
+    buckets. Predictions are only trusted once enough samples exist and the
+    held-out error is small; without NumPy the model stays off and
+    everything goes to the LLM.
+    """
+    
+    FEATURES = 1 << 16
+    MAX_SAMPLES = 3000
+    RIDGE = 1.0
+    SOLVER_ITERATIONS = 100
+    MAX_HOLDOUT_ERROR = 1.5
+    REFIT_EVERY = 50
+    
+    def __init__(self, db_path, min_samples=LOCAL_MODEL_MIN_SAMPLES):
+        self.min_samples = max(10, min_samples)
+        self.weights = None
+        self.bias = 0.0
+        self.holdout_error = None
+        self.new_samples = 0
+        self.trained = False
+        self.lock = threading.Lock()
+        self.fit_lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=SQLITE_TIMEOUT)
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS relevance_samples (
+                    content_hash TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    created REAL NOT NULL
+                )
+            """)
+    
+    @staticmethod
+    def _text(article):
+        return f"{article['title']} {article['summary']}"
+    
+    def _features(self, texts):
+        """Sparse (row, bucket, value) arrays of L2-normalized hashed word and word-pair counts"""
+        rows, columns, values = [], [], []
+        for row, text in enumerate(texts):
+            words = [w for w in re.findall(r'[a-z0-9]+', text.lower()) if w not in STOPWORDS]
+            counts = {}
+            for term in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                bucket = zlib.crc32(term.encode('utf-8')) % self.FEATURES
+                counts[bucket] = counts.get(bucket, 0) + 1
+            norm = sum(c * c for c in counts.values()) ** 0.5 or 1.0
+            rows.extend([row] * len(counts))
+            columns.extend(counts)
+            values.extend(c / norm for c in counts.values())
+        return (np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64),
+                np.array(values, dtype=np.float64))
+    
+    def _multiply(self, features, weights, count):
+        rows, columns, values = features
+        return np.bincount(rows, weights=values * weights[columns], minlength=count)
+    
+    def _solve(self, features, scores):
+        """Ridge weights from (X'X + RIDGE*I) w = X'(y - mean) by conjugate gradients"""
+        rows, columns, values = features
+        bias = float(scores.mean())
+        
+        def apply(w):
+            residual = self._multiply(features, w, len(scores))
+            return np.bincount(columns, weights=values * residual[rows], minlength=self.FEATURES) + self.RIDGE * w
+        
+        weights = np.zeros(self.FEATURES)
+        remainder = np.bincount(columns, weights=values * (scores - bias)[rows], minlength=self.FEATURES)
+        direction = remainder.copy()
+        error = remainder @ remainder
+        for _ in range(self.SOLVER_ITERATIONS):
+            if error < 1e-10:
+                break
+            applied = apply(direction)
+            step = error / (direction @ applied)
+            weights += step * direction
+            remainder -= step * applied
+            new_error = remainder @ remainder
+            direction = remainder + (new_error / error) * direction
+            error = new_error
+        return weights, bias
+    
+    def _subset(self, features, mask):
+        """Sparse rows selected by a boolean row mask, renumbered from 0"""
+        rows, columns, values = features
+        keep = mask[rows]
+        renumber = np.cumsum(mask) - 1
+        return renumber[rows[keep]], columns[keep], values[keep]
+    
+    def add_sample(self, article, score):
+        """Remember an LLM-assigned score as a training example"""
+        text = self._text(article)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO relevance_samples (content_hash, text, score, created) VALUES (?, ?, ?, ?)",
+                (content_hash(article['title'], article['summary']), text, int(score), time.time())
+            )
+            self.new_samples += 1
+    
+    def fit(self):
+        """(Re)train on the most recent samples; returns True if the model is usable"""
+        if not np:
+            return False
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT text, score FROM relevance_samples ORDER BY created DESC LIMIT ?", (self.MAX_SAMPLES,)
+            ).fetchall()
+            self.new_samples = 0
+        if len(rows) < self.min_samples:
+            return False
+        
+        features = self._features([text for text, _ in rows])
+        scores = np.array([score for _, score in rows], dtype=np.float64)
+        
+        # Every fifth sample is held out to check the model before trusting it
+        holdout = np.arange(len(rows)) % 5 == 0
+        weights, bias = self._solve(self._subset(features, ~holdout), scores[~holdout])
+        predicted = self._multiply(self._subset(features, holdout), weights, int(holdout.sum())) + bias
+        error = float(np.abs(predicted - scores[holdout]).mean())
+        
+        weights, bias = self._solve(features, scores)
+        with self.lock:
+            self.weights, self.bias, self.holdout_error = weights, bias, error
+        return self.ready()
+    
+    def ready(self):
+        return self.weights is not None and self.holdout_error <= self.MAX_HOLDOUT_ERROR
+    
+    def maybe_refit(self):
+        """Train on first use, then again once enough new samples have come in (call once per cycle)"""
+        if not np:
+            return
+        with self.fit_lock:
+            with self.lock:
+                if self.trained and self.new_samples < self.REFIT_EVERY:
+                    return
+                self.trained = True
+            self.fit()
+    
+    def predict(self, articles):
+        """Predicted 1-10 scores for a batch of articles, or None if the model isn't ready"""
+        if not articles or not self.ready():
+            return None
+        predictions = self._multiply(self._features([self._text(a) for a in articles]), self.weights, len(articles))
+        return [min(10.0, max(1.0, float(p) + self.bias)) for p in predictions]
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'how', 'in',
+    'is', 'it', 'its', 'new', 'of', 'on', 'or', 'that', 'the', 'to', 'what', 'why', 'with'
+}
+
+class NearDuplicateIndex:
+    """MinHash/LSH index over title words and content shingles.
+    
+    Each article gets a MinHash signature for its title (words and word
+    pairs) and, when there is enough text, for its content (3-word
+    shingles). Signatures are split into bands and bucketed, so a lookup
+    only compares against articles sharing a bucket instead of every
+    article seen so far. Entries from earlier cycles can be kept in SQLite
+    so a repeat of an already-covered story is matched to the copy that
+    was published before, when that copy is also in this cycle.
+    """
+    
+    NUM_PERM = 32
+    BANDS = 8
+    TITLE_THRESHOLD = 0.5
+    CONTENT_THRESHOLD = 0.7
+    MIN_CONTENT_CHARS = 200
+    PRIME = (1 << 31) - 1
+    
+    def __init__(self, db_path=None, history_hours=0):
+        rng = random.Random(42)
+        self.perms = [(rng.randrange(1, self.PRIME), rng.randrange(0, self.PRIME)) for _ in range(self.NUM_PERM)]
+        self.perm_a = self.perm_b = None
+        self.rows = self.NUM_PERM // self.BANDS
+        self.history_hours = history_hours
+        self.conn = None
+        if db_path and history_hours > 0:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=SQLITE_TIMEOUT)
+            with self.conn:
+                self.conn.execute("""
+                    CREATE TABLE IF NOT EXISTS dedup_index (
+                        url_key TEXT PRIMARY KEY,
+                        title_sig TEXT NOT NULL,
+                        content_sig TEXT,
+                        score INTEGER NOT NULL,
+                        seen REAL NOT NULL
+                    )
+                """)
+        self.reset()
+    
+    def reset(self):
+        """Start a new cycle, reloading recent history if persistence is on"""
+        self.entries = []
+        self.buckets = {}
+        self.current = {}
+        if self.conn:
+            since = time.time() - self.history_hours * 3600
+            rows = self.conn.execute(
+                "SELECT url_key, title_sig, content_sig, score FROM dedup_index WHERE seen >= ?", (since,)
+            ).fetchall()
+            for url_key, title_sig, content_sig, score in rows:
+                self._insert({
+                    'url_key': url_key,
+                    'title': tuple(json.loads(title_sig)),
+                    'content': tuple(json.loads(content_sig)) if content_sig else None,
+                    'score': score,
+                    'current': False
+                })
+    
+    def _tokens(self, text):
+        return [w for w in re.findall(r'[a-z0-9]+', text.lower()) if w not in STOPWORDS]
+    
+    def _signature(self, shingles):
+        hashes = [zlib.crc32(s.encode('utf-8')) for s in shingles]
+        if np:
+            if self.perm_a is None:
+                self.perm_a = np.array([a for a, _ in self.perms], dtype=np.uint64)[:, None]
+                self.perm_b = np.array([b for _, b in self.perms], dtype=np.uint64)[:, None]
+            # 31-bit prime and 32-bit hashes keep a * h + b inside uint64
+            values = (self.perm_a * np.array(hashes, dtype=np.uint64) + self.perm_b) % self.PRIME
+            return tuple(int(v) for v in values.min(axis=1))
+        return tuple(min((a * h + b) % self.PRIME for h in hashes) for a, b in self.perms)
+    
+    def signatures(self, article):
+        """(title signature, content signature or None) for an article"""
+        words = self._tokens(article['title'])
+        title_shingles = set(words) | {' '.join(pair) for pair in zip(words, words[1:])}
+        title_sig = self._signature(title_shingles or {article['title'].lower()})
+        
+        content = article.get('full_content') or ''
+        content_sig = None
+        if len(content) >= self.MIN_CONTENT_CHARS:
+            words = self._tokens(content[:1000])
+            content_shingles = {' '.join(words[i:i + 3]) for i in range(len(words) - 2)}
+            if content_shingles:
+                content_sig = self._signature(content_shingles)
+        return title_sig, content_sig
+    
+    def _bands(self, field, sig):
+        return [(field, i, sig[i * self.rows:(i + 1) * self.rows]) for i in range(self.BANDS)]
+    
+    def _similarity(self, sig_a, sig_b):
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / self.NUM_PERM
+    
+    def _insert(self, entry):
+        index = len(self.entries)
+        self.entries.append(entry)
+        for field in ('title', 'content'):
+            if entry[field]:
+                for key in self._bands(field, entry[field]):
+                    self.buckets.setdefault(key, []).append(index)
+    
+    def find_duplicate(self, url_key, title_sig, content_sig):
+        """Return an entry from this cycle that this article duplicates, if any"""
+        return next(self.find_duplicates(url_key, title_sig, content_sig), None)
+    
+    def find_duplicates(self, url_key, title_sig, content_sig):
+        """Yield every entry from this cycle that this article duplicates.
+        
+        Same-URL entries from this cycle always count. A match against an
+        entry from an earlier cycle resolves to that URL's copy in this
+        cycle; if there is none, the earlier copy isn't in the output and
+        can't stand in for this article, so the match is ignored.
+        """
+        candidates = set()
+        for field, sig in (('title', title_sig), ('content', content_sig)):
+            if sig:
+                for key in self._bands(field, sig):
+                    candidates.update(self.buckets.get(key, ()))
+        
+        found = set()
+        for index in sorted(candidates):
+            entry = self.entries[index]
+            if entry.get('dead'):
+                continue
+            if entry['url_key'] == url_key:
+                match = entry if entry['current'] else None
+            else:
+                match = entry if entry['current'] else self.current.get(entry['url_key'])
+                if match is not None and not (
+                    self._similarity(entry['title'], title_sig) >= self.TITLE_THRESHOLD
+                    or (entry['content'] and content_sig
+                        and self._similarity(entry['content'], content_sig) >= self.CONTENT_THRESHOLD)
+                ):
+                    match = None
+            if match is None or match.get('dead') or id(match) in found:
+                continue
+            found.add(id(match))
+            yield match
+    
+    def add(self, url_key, title_sig, content_sig, score):
+        entry = {'url_key': url_key, 'title': title_sig, 'content': content_sig, 'score': score, 'current': True}
+        self._insert(entry)
+        self.current[url_key] = entry
+        return entry
+    
+    def discard(self, entry):
+        """Drop an entry that was superseded by a better-scoring copy"""
+        entry['dead'] = True
+    
+    def persist(self):
+        """Save this cycle's entries and drop ones older than the history window"""
+        if not self.conn:
+            return
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO dedup_index (url_key, title_sig, content_sig, score, seen) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (e['url_key'], json.dumps(e['title']), json.dumps(e['content']) if e['content'] else None, e['score'], now)
+                    for e in self.entries if e['current'] and not e.get('dead')
+                ]
+            )
+            self.conn.execute("DELETE FROM dedup_index WHERE seen < ?", (now - self.history_hours * 3600,))
+
+class TopArticles:
+    """Running top-K of articles with near-duplicate replacement.
+    
+    Articles can arrive in any order: a duplicate only displaces the copies
+    already held when it ranks higher (by score, then URL). Copies a held
+    article hides are kept with it and placed again if it is replaced, so
+    the result is the same as one pass over the articles best first. Only
+    the K best articles and the copies they hide are kept in memory;
+    everything else is reduced to its dedup signatures.
+    """
+    
+    def __init__(self, dedup_index, limit=MAX_OUTPUT_ARTICLES):
+        self.dedup_index = dedup_index
+        self.limit = limit
+        self.heap = []
+        self.live = 0
+        self.seq = 0
+        self.seen_urls = set()
+    
+    @staticmethod
+    def _rank(entry):
+        return entry['score'], entry['url_key']
+    
+    def offer(self, article):
+        """Consider an article; returns True if it is currently in the top K"""
+        self.seen_urls.add(normalize_url(article['url']))
+        return self._place(article)
+    
+    def _place(self, article):
+        url_key = normalize_url(article['url'])
+        score = article.get('perplexity_score', 5)
+        rank = (score, url_key)
+        title_sig, content_sig = self.dedup_index.signatures(article)
+        
+        duplicates = list(self.dedup_index.find_duplicates(url_key, title_sig, content_sig))
+        stronger = [entry for entry in duplicates if self._rank(entry) >= rank]
+        if stronger:
+            holder = max(stronger, key=self._rank)
+            if 'article' in holder:
+                holder.setdefault('hidden', []).append(article)
+            else:
+                self._release(article)
+            return False
+        # Displaced copies are hidden by this one; what they were hiding gets placed again
+        displaced, unhidden = [], []
+        for duplicate in duplicates:
+            article_held, hidden = self._remove(duplicate)
+            if article_held is not None:
+                displaced.append(article_held)
+            unhidden.extend(hidden)
+        
+        if self.live >= self.limit and rank <= self.heap[0][:2]:
+            # Can't make the cut, but stays indexed so weaker copies are still caught
+            self.dedup_index.add(url_key, title_sig, content_sig, score)
+            for dropped in [article] + displaced + unhidden:
+                self._release(dropped)
+            return False
+        
+        entry = self.dedup_index.add(url_key, title_sig, content_sig, score)
+        entry['article'] = article
+        if displaced:
+            entry['hidden'] = displaced
+        heapq.heappush(self.heap, (score, url_key, self.seq, entry))
+        self.seq += 1
+        self.live += 1
+        
+        while self.live > self.limit:
+            evicted = heapq.heappop(self.heap)[-1]
+            if evicted.get('dead') or 'article' not in evicted:
+                continue
+            self._release(evicted.pop('article'))
+            # Hidden copies rank below their holder, so they can't make the cut either
+            for copy in evicted.pop('hidden', ()):
+                self._release(copy)
+            self.live -= 1
+        
+        self._drop_stale_top()
+        
+        # Copies the replaced articles hid may not duplicate this one; best first, as a sorted pass would
+        for copy in sorted(unhidden, key=lambda a: (a.get('perplexity_score', 5), normalize_url(a['url'])), reverse=True):
+            self._place(copy)
+        return 'article' in entry
+    
+    def _remove(self, entry):
+        """Drop a superseded entry; returns its article (if held) and the copies it was hiding"""
+        self.dedup_index.discard(entry)
+        article = entry.pop('article', None)
+        if article is not None:
+            self.live -= 1
+        self._drop_stale_top()
+        return article, entry.pop('hidden', [])
+    
+    @staticmethod
+    def _release(article):
+        # Dropped articles hand their content budget back to the ContentSpill
+        if isinstance(article, Article):
+            article.release()
+    
+    def _drop_stale_top(self):
+        while self.heap and (self.heap[0][-1].get('dead') or 'article' not in self.heap[0][-1]):
+            heapq.heappop(self.heap)
+    
+    def results(self):
+        """Held articles, best first (equal scores ordered by URL)"""
+        held = [(score, url_key, entry['article']) for score, url_key, _, entry in self.heap if 'article' in entry]
+        held.sort(key=lambda item: item[:2], reverse=True)
+        return [article for _, _, article in held]
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`"""
+    
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class FeedSchedule:
+    """Per-feed polling intervals learned from publish cadence, feed ttl and HTTP caching"""
+    
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=SQLITE_TIMEOUT)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS feed_schedule (
+                    feed_url TEXT PRIMARY KEY,
+                    interval REAL NOT NULL,
+                    next_poll REAL NOT NULL,
+                    last_polled REAL,
+                    newest_entry REAL,
+                    cadence REAL
+                )
+            """)
+    
+    def _row(self, feed_url):
+        return self.conn.execute(
+            "SELECT interval, next_poll, newest_entry FROM feed_schedule WHERE feed_url = ?", (feed_url,)
+        ).fetchone()
+    
+    def due(self, sources, now=None):
+        """Sources whose next poll time has passed (feeds never polled are due at once)"""
+        now = now or time.time()
+        with self.lock:
+            return {
+                name: url for name, url in sources.items()
+                if (row := self._row(url)) is None or row[1] <= now
+            }
+    
+    def next_poll(self, sources):
+        """Earliest upcoming poll time across the given sources"""
+        with self.lock:
+            times = [row[1] if (row := self._row(url)) else 0 for url in sources.values()]
+        return min(times) if times else time.time() + DEFAULT_POLL_MINUTES * 60
+    
+    def _cadence(self, published):
+        """Median gap in seconds between consecutive entries, if there are enough dates"""
+        published = sorted(published, reverse=True)
+        gaps = sorted(a - b for a, b in zip(published, published[1:]) if a > b)
+        return gaps[len(gaps) // 2] if gaps else None
+    
+    def observe(self, feed_url, entries, ttl_minutes=None, fresh_until=None):
+        """Record a successful poll and schedule the next one"""
+        now = time.time()
+        published = [
+            time.mktime(entry.published_parsed) for entry in entries
+            if entry.get('published_parsed')
+        ]
+        with self.lock, self.conn:
+            row = self._row(feed_url)
+            interval = row[0] if row else DEFAULT_POLL_MINUTES * 60
+            newest_seen = row[2] if row else None
+            newest = max(published) if published else newest_seen
+            has_new = newest_seen is None or (newest is not None and newest > newest_seen)
+            cadence = self._cadence(published)
+            
+            # Aim for roughly one poll per new item; back off while nothing changes
+            target = cadence if cadence else interval
+            if not has_new:
+                target = max(target, interval * 1.5)
+            if ttl_minutes:
+                target = max(target, ttl_minutes * 60)
+            if fresh_until:
+                target = max(target, fresh_until - now)
+            interval = min(max(target, MIN_POLL_MINUTES * 60), MAX_POLL_MINUTES * 60)
+            
+            self.conn.execute("""
+                INSERT INTO feed_schedule (feed_url, interval, next_poll, last_polled, newest_entry, cadence)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(feed_url) DO UPDATE SET
+                    interval = excluded.interval,
+                    next_poll = excluded.next_poll,
+                    last_polled = excluded.last_polled,
+                    newest_entry = excluded.newest_entry,
+                    cadence = excluded.cadence
+            """, (feed_url, interval, now + interval, now, newest, cadence))
+    
+    def observe_failure(self, feed_url):
+        """Poll a failing feed less often (the circuit breaker handles the short term)"""
+        now = time.time()
+        with self.lock, self.conn:
+            row = self._row(feed_url)
+            interval = min((row[0] if row else DEFAULT_POLL_MINUTES * 60) * 2, MAX_POLL_MINUTES * 60)
+            self.conn.execute("""
+                INSERT INTO feed_schedule (feed_url, interval, next_poll, last_polled)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(feed_url) DO UPDATE SET
+                    interval = excluded.interval,
+                    next_poll = excluded.next_poll,
+                    last_polled = excluded.last_polled
+            """, (feed_url, interval, now + interval, now))
+
+    def defer(self, feed_url, until):
+        """Don't poll before `until` (e.g. while the feed's circuit breaker is open)"""
+        with self.lock, self.conn:
+            row = self._row(feed_url)
+            interval = row[0] if row else DEFAULT_POLL_MINUTES * 60
+            self.conn.execute("""
+                INSERT INTO feed_schedule (feed_url, interval, next_poll)
+                VALUES (?, ?, ?)
+                ON CONFLICT(feed_url) DO UPDATE SET
+                    next_poll = MAX(next_poll, excluded.next_poll)
+            """, (feed_url, interval, until))
+
+def shard_sources(sources, shard_count):
+    """Split sources into shards by host, so per-host limits still hold inside each worker"""
+    shards = [{} for _ in range(shard_count)]
+    for name, url in sources.items():
+        host = urlparse(url).netloc.lower()
+        shards[zlib.crc32(host.encode('utf-8')) % shard_count][name] = url
+    return shards
+
+class ShardLeases:
+    """SQLite lease table through which workers on any host claim the shards of a cycle"""
+    
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=SQLITE_TIMEOUT, isolation_level=None)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS shard_leases (
+                cycle_id TEXT NOT NULL,
+                shard INTEGER NOT NULL,
+                shard_count INTEGER NOT NULL,
+                owner TEXT,
+                lease_until REAL NOT NULL DEFAULT 0,
+                done INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (cycle_id, shard)
+            )
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(shard_leases)")}
+        if 'attempts' not in columns:
+            self.conn.execute("ALTER TABLE shard_leases ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+    
+    def create_cycle(self, cycle_id, shard_count):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO shard_leases (cycle_id, shard, shard_count) VALUES (?, ?, ?)",
+            [(cycle_id, shard, shard_count) for shard in range(shard_count)]
+        )
+    
+    def claim(self, owner, lease_seconds, cycle_id=None):
+        """Take an unfinished shard whose lease is free or expired; None if there is none"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            query = ("SELECT cycle_id, shard, shard_count FROM shard_leases "
+                     "WHERE done = 0 AND lease_until < ? AND attempts < ?")
+            params = [now, SHARD_MAX_ATTEMPTS]
+            if cycle_id:
+                query += " AND cycle_id = ?"
+                params.append(cycle_id)
+            row = self.conn.execute(query + " ORDER BY cycle_id, shard LIMIT 1", params).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE shard_leases SET owner = ?, lease_until = ? WHERE cycle_id = ? AND shard = ?",
+                    (owner, now + lease_seconds, row[0], row[1])
+                )
+            self.conn.execute("COMMIT")
+            return row
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+    
+    def complete(self, cycle_id, shard):
+        self.conn.execute(
+            "UPDATE shard_leases SET done = 1 WHERE cycle_id = ? AND shard = ?", (cycle_id, shard)
+        )
+    
+    def release(self, cycle_id, shard):
+        """Give a failed shard back at once instead of waiting for its lease to run out"""
+        self.conn.execute(
+            "UPDATE shard_leases SET lease_until = 0, owner = NULL, attempts = attempts + 1 "
+            "WHERE cycle_id = ? AND shard = ?", (cycle_id, shard)
+        )
+    
+    def pending(self, cycle_id):
+        """Unfinished shards that may still be (re)tried"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM shard_leases WHERE cycle_id = ? AND done = 0 AND attempts < ?",
+            (cycle_id, SHARD_MAX_ATTEMPTS)
+        ).fetchone()[0]
+    
+    def failed(self, cycle_id):
+        """Shards given up on after SHARD_MAX_ATTEMPTS failures"""
+        return [row[0] for row in self.conn.execute(
+            "SELECT shard FROM shard_leases WHERE cycle_id = ? AND done = 0 AND attempts >= ?",
+            (cycle_id, SHARD_MAX_ATTEMPTS)
+        )]
+    
+    def forget(self, cycle_id):
+        self.conn.execute("DELETE FROM shard_leases WHERE cycle_id = ?", (cycle_id,))
+
+class CircuitBreaker:
+    """Skip a source for a cooldown period after repeated consecutive failures.
+    
+    With a `db_path` the state is written through to SQLite and loaded on
+    start, so short-lived shard workers still remember feeds that keep failing.
+    """
+    
+    def __init__(self, failure_threshold, cooldown_seconds, db_path=None):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failures = {}
+        self.open_until = {}
+        self.lock = threading.Lock()
+        self.conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=SQLITE_TIMEOUT)
+            with self.lock, self.conn:
+                self.conn.execute("""
+                    CREATE TABLE IF NOT EXISTS circuit_breakers (
+                        key TEXT PRIMARY KEY,
+                        failures INTEGER NOT NULL,
+                        open_until REAL
+                    )
+                """)
+                for key, failures, open_until in self.conn.execute(
+                    "SELECT key, failures, open_until FROM circuit_breakers"
+                ):
+                    self.failures[key] = failures
+                    if open_until is not None:
+                        self.open_until[key] = open_until
+    
+    def _save(self, key):
+        if self.conn is None:
+            return
+        with self.conn:
+            if key in self.failures or key in self.open_until:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO circuit_breakers (key, failures, open_until) VALUES (?, ?, ?)",
+                    (key, self.failures.get(key, 0), self.open_until.get(key))
+                )
+            else:
+                self.conn.execute("DELETE FROM circuit_breakers WHERE key = ?", (key,))
+    
+    def allow(self, key):
+        """False while the breaker for `key` is open"""
+        with self.lock:
+            until = self.open_until.get(key)
+            if until is None:
+                return True
+            if time.time() >= until:
+                # Half-open: let one attempt through; a failure re-opens it at once
+                del self.open_until[key]
+                self.failures[key] = self.failure_threshold - 1
+                self._save(key)
+                return True
+            return False
+    
+    def record_success(self, key):
+        with self.lock:
+            if key in self.failures or key in self.open_until:
+                self.failures.pop(key, None)
+                self.open_until.pop(key, None)
+                self._save(key)
+    
+    def record_failure(self, key):
+        with self.lock:
+            self.failures[key] = self.failures.get(key, 0) + 1
+            if self.failures[key] >= self.failure_threshold:
+                self.open_until[key] = time.time() + self.cooldown_seconds
+            self._save(key)
+
+class HybridNewsScraper:
+    def __init__(self, concurrent=CONCURRENT_FETCH, max_workers=MAX_WORKERS, per_host_limit=PER_HOST_LIMIT):
         self.perplexity_api_key = PERPLEXITY_API_KEY
         self.perplexity_url = "https://api.perplexity.ai/chat/completions"
         self.rss_sources, self.api_sources = self.get_diverse_news_sources()
+        
+        weights = {kw: 3 for kw in HIGH_PRIORITY_KEYWORDS}
+        weights.update({kw: 2 for kw in MEDIUM_PRIORITY_KEYWORDS})
+        weights.update({kw: 1 for kw in LOW_PRIORITY_KEYWORDS})
+        self.keyword_matcher = KeywordMatcher(weights, RELEVANT_KEYWORDS, UNWANTED_KEYWORDS)
+        
+        # Concurrency controls
+        self.concurrent = concurrent
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        self._host_buckets = {}
+        
+        # One pooled keep-alive session for every request, with retry/backoff
+        self.session = self.create_session()
+        self.feed_breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_COOLDOWN_MINUTES * 60, STORE_PATH)
+        
+        self.http_cache = HttpCache(os.path.join(CACHE_DIR, 'http')) if HTTP_CACHE_ENABLED else None
+        self.store = ProcessedArticleStore(STORE_PATH) if INCREMENTAL_ENABLED else None
+        
+        # Perplexity enrichment
+        self.enrich_batch_size = max(1, ENRICH_BATCH_SIZE)
+        self.enrich_concurrency = max(1, ENRICH_CONCURRENCY)
+        self.perplexity_limiter = TokenBucket(ENRICH_RATE_PER_MIN / 60, capacity=self.enrich_concurrency)
+        self.enrichment_cache = EnrichmentCache(STORE_PATH) if ENRICH_CACHE_ENABLED else None
+        self.relevance_model = LocalRelevanceModel(STORE_PATH) if LOCAL_MODEL_ENABLED else None
+        self.history = ArticleHistory(STORE_PATH) if HISTORY_ENABLED else None
+        
+        self.dedup_index = NearDuplicateIndex(STORE_PATH, DEDUP_HISTORY_HOURS)
+        self.feed_schedule = FeedSchedule(STORE_PATH)
+        
+        self.metrics = CycleMetrics()
+        self._profilers = None
+        
+        # Articles of a cycle share one scrape_time and a content budget
+        self.content_spill = ContentSpill(int(MEMORY_BUDGET_MB * 1024 * 1024))
+        self.scrape_time = datetime.now().isoformat()
     
     def get_diverse_news_sources(self):
         """Multiple diverse news sources for unbiased coverage"""
@@ -82,99 +1709,217 @@ class HybridNewsScraper:
         
         return rss_sources, api_sources
     
-    def calculate_keyword_score(self, title, summary, content=""):
-        """Calculate relevance score based on keyword presence"""
-        # High-priority keywords (weight: 3 points each)
-        high_priority = [
-            'artificial intelligence', 'salesforce', 'crm', 'ai', 'machine learning',
-            'b2b', 'enterprise software', 'saas', 'automation', 'digital transformation'
-        ]
-        
-        # Medium-priority keywords (weight: 2 points each)
-        medium_priority = [
-            'cloud computing', 'data analytics', 'cybersecurity', 'startup', 'funding',
-            'api', 'integration', 'business intelligence', 'venture capital', 'fintech'
-        ]
+    def thread_pool(self, max_workers):
+        """ThreadPoolExecutor whose workers are profiled too when profiling is on"""
+        return ThreadPoolExecutor(max_workers=max_workers, initializer=self._start_worker_profiler)
+    
+    def _start_worker_profiler(self):
+        if self._profilers is not None:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            self._profilers.append(profiler)
+    
+    def create_session(self):
+        """Shared requests session with connection pooling and retries"""
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
         
-        # Low-priority keywords (weight: 1 point each)
-        low_priority = [
-            'technology', 'software', 'platform', 'innovation', 'developer',
-            'application', 'system', 'solution', 'product', 'service'
-        ]
+        session = requests.Session()
+        retry = Retry(
+            total=HTTP_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.max_workers,
+            pool_maxsize=self.max_workers,
+            max_retries=retry
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    @contextmanager
+    def host_slot(self, url):
+        """Limit how many requests hit the same host at once, and how often"""
+        host = urlparse(url).netloc.lower()
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+                self._host_buckets[host] = TokenBucket(HOST_RATE_PER_SEC, capacity=HOST_BURST)
+            bucket = self._host_buckets[host]
+        with slot:
+            bucket.acquire()
+            yield
+    
+    def fetch_url(self, url, timeout=5, max_bytes=None, content_types=None):
+        """GET a URL, reusing the cached body when it is fresh or the server says 304.
         
-        text = (title + " " + summary + " " + content).lower()
-        score = 0
+        The body is streamed and cut off after `max_bytes`; responses whose
+        Content-Type isn't in `content_types` are rejected before the body is read.
+        """
+        meta, cached_body = self.http_cache.get(url) if self.http_cache else (None, None)
         
-        # Count keyword matches
-        for keyword in high_priority:
-            if keyword in text:
-                score += 3
+        if meta and self.http_cache.is_fresh(meta):
+            return cached_body, meta.get('content_type', '')
         
-        for keyword in medium_priority:
-            if keyword in text:
-                score += 2
+        headers = dict(BROWSER_HEADERS)
+        if meta:
+            headers.update(self.http_cache.conditional_headers(meta))
         
-        for keyword in low_priority:
-            if keyword in text:
-                score += 1
+        with self.host_slot(url):
+            response = self.session.get(url, headers=headers, timeout=timeout, stream=True)
+            try:
+                if response.status_code == 304 and meta:
+                    self.http_cache.refresh(url, meta, response.headers)
+                    return cached_body, meta.get('content_type', '')
+                
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '')
+                if content_types and content_type and not any(t in content_type.lower() for t in content_types):
+                    raise ValueError(f"Skipping {content_type} content at {url}")
+                
+                chunks, size = [], 0
+                for chunk in response.iter_content(chunk_size=16384):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if max_bytes and size >= max_bytes:
+                        break
+                body = b''.join(chunks)
+                if max_bytes:
+                    body = body[:max_bytes]
+            finally:
+                response.close()
         
-        # Normalize to 1-10 scale
-        normalized_score = min(10, max(1, score))
-        return normalized_score
+        if self.http_cache:
+            self.http_cache.store(url, response.headers, body, content_type)
+        return body, content_type
+    
+    def calculate_keyword_score(self, title, summary, content=""):
+        """Calculate relevance score based on keyword presence"""
+        score, _ = self.keyword_matcher.analyze(title, summary, content)
+        return score
     
     def filter_relevant_content(self, title, description="", content=""):
         """Filter for tech, AI, Salesforce, B2B content"""
-        relevant_keywords = [
-            'artificial intelligence', 'ai', 'machine learning', 'ml', 'deep learning',
-            'salesforce', 'crm', 'customer relationship', 'saas', 'software as a service',
-            'b2b', 'business to business', 'enterprise software', 'business intelligence',
-            'automation', 'digital transformation', 'cloud computing', 'api', 'integration',
-            'startup', 'fintech', 'martech', 'adtech', 'proptech', 'healthtech',
-            'venture capital', 'funding', 'ipo', 'acquisition', 'merger',
-            'cybersecurity', 'data analytics', 'big data', 'blockchain', 'cryptocurrency'
-        ]
-        
-        unwanted_keywords = [
-            'amazon prime', 'black friday', 'cyber monday', 'discount', 'sale', 'deal',
-            'iphone', 'samsung galaxy', 'playstation', 'xbox', 'nintendo',
-            'movie review', 'tv show', 'celebrity', 'sports', 'weather',
-            'recipe', 'fashion', 'beauty', 'travel deals', 'hotel booking'
-        ]
-        
-        text = (title + " " + description + " " + content).lower()
-        is_relevant = any(keyword in text for keyword in relevant_keywords)
-        has_unwanted = any(keyword in text for keyword in unwanted_keywords)
-        
-        return is_relevant and not has_unwanted
+        _, is_relevant = self.keyword_matcher.analyze(title, description, content)
+        return is_relevant
     
     def extract_simple_content(self, url):
         """Simple content extraction with fallback"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=5)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            content_selectors = ['article', '.article-body', '.entry-content', 'main']
-            content = ''
-            
-            for selector in content_selectors:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    content = content_div.get_text().strip()
-                    break
-            
-            if not content:
-                paragraphs = soup.find_all('p')
-                content = '\n'.join([p.get_text().strip() for p in paragraphs[:5]])
-            
-            return content[:1000]
+            body, _ = self.fetch_url(
+                url, timeout=5, max_bytes=EXTRACT_MAX_BYTES, content_types=HTML_CONTENT_TYPES
+            )
+            if lxml_html:
+                return self._extract_with_lxml(body)
+            return self._extract_with_soup(body)
         except:
             return ""
     
+    def _collect_text(self, fragments, limit=EXTRACT_MAX_CHARS):
+        """Join text fragments, stopping as soon as `limit` characters are in hand"""
+        collected, size = [], 0
+        for fragment in fragments:
+            collected.append(fragment)
+            size += len(fragment)
+            if size >= limit:
+                break
+        return ''.join(collected).strip()[:limit]
+    
+    def _extract_with_lxml(self, body):
+        doc = lxml_html.fromstring(body)
+        for junk in doc.xpath('//script|//style|//noscript'):
+            junk.drop_tree()
+        
+        for xpath in CONTENT_XPATHS:
+            found = doc.xpath(xpath)
+            if found:
+                content = self._collect_text(found[0].itertext())
+                if content:
+                    return content
+                break
+        
+        paragraphs = (p.text_content().strip() for p in doc.iter('p'))
+        return self._collect_text(
+            (text + '\n' for i, text in zip(range(5), paragraphs))
+        )
+    
+    def _extract_with_soup(self, body):
+        soup = bs4.BeautifulSoup(body, 'html.parser')
+        content = ''
+        
+        for selector in CONTENT_SELECTORS:
+            content_div = soup.select_one(selector)
+            if content_div:
+                content = content_div.get_text().strip()
+                break
+        
+        if not content:
+            paragraphs = soup.find_all('p')
+            content = '\n'.join([p.get_text().strip() for p in paragraphs[:5]])
+        
+        return content[:EXTRACT_MAX_CHARS]
+    
+    def keyword_enhancement(self, article):
+        """Keyword-based stand-in when Perplexity is unavailable"""
+        self.metrics.count('keyword_fallback', article['source'])
+        keyword_score = self.calculate_keyword_score(
+            article['title'], 
+            article['summary'],
+            article.get('full_content', '')
+        )
+        return {
+            'perplexity_score': keyword_score,
+            'perplexity_summary': article['summary']
+        }
+    
+    def call_perplexity(self, prompt, max_tokens=150, timeout=10):
+        """Send one chat-completion request; returns the reply text or None"""
+        payload = {
+            "model": "sonar",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a tech news analyst. Provide concise, accurate analysis."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "max_tokens": max_tokens,
+            "temperature": 0.2,
+            "top_p": 0.9
+        }
+        
+        headers = {
+            "Authorization": f"Bearer {self.perplexity_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        self.perplexity_limiter.acquire()
+        with self.metrics.stage('enrich_request', 'perplexity'):
+            response = self.session.post(
+                self.perplexity_url,
+                json=payload,
+                headers=headers,
+                timeout=timeout
+            )
+        
+        if response.status_code != 200:
+            self.metrics.count('enrich_http_error', 'perplexity')
+            return None
+        result = response.json()
+        return result['choices'][0]['message']['content']
+    
     def enhance_with_perplexity(self, article):
-        """Enhanced article analysis using Perplexity API"""
+        """Enhanced article analysis using Perplexity API; returns (enhancement, from_perplexity)"""
         try:
             prompt = f"""Analyze this article briefly:
 Title: {article['title']}
@@ -186,113 +1931,248 @@ Provide only:
 
 Format: "Score: X | Summary: Your summary here"
 """
+            content = self.call_perplexity(prompt)
             
-            payload = {
-                "model": "sonar",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are a tech news analyst. Provide concise, accurate analysis."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "max_tokens": 150,
-                "temperature": 0.2,
-                "top_p": 0.9
-            }
-            
-            headers = {
-                "Authorization": f"Bearer {self.perplexity_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(
-                self.perplexity_url,
-                json=payload,
-                headers=headers,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                content = result['choices'][0]['message']['content']
+            if content and "Score:" in content and "|" in content:
+                parts = content.split("|")
+                score_part = parts[0].strip()
+                summary_part = parts[1].strip() if len(parts) > 1 else ""
                 
-                if "Score:" in content and "|" in content:
-                    parts = content.split("|")
-                    score_part = parts[0].strip()
-                    summary_part = parts[1].strip() if len(parts) > 1 else ""
-                    
-                    score_match = re.search(r'(\d+)', score_part)
-                    score = int(score_match[1]) if score_match else 5
-                    
-                    summary = summary_part.replace("Summary:", "").strip()
-                    
-                    return {
-                        'perplexity_score': min(max(score, 1), 10),
-                        'perplexity_summary': summary if summary else article['summary']
-                    }
+                score_match = re.search(r'(\d+)', score_part)
+                score = int(score_match[1]) if score_match else 5
+                
+                summary = summary_part.replace("Summary:", "").strip()
+                if score_match and self.relevance_model:
+                    self.relevance_model.add_sample(article, min(max(score, 1), 10))
+                
+                return {
+                    'perplexity_score': min(max(score, 1), 10),
+                    'perplexity_summary': summary if summary else article['summary']
+                }, bool(score_match)
             
             # Fallback to keyword-based scoring
-            keyword_score = self.calculate_keyword_score(
-                article['title'], 
-                article['summary'],
-                article.get('full_content', '')
-            )
-            return {
-                'perplexity_score': keyword_score,
-                'perplexity_summary': article['summary']
-            }
+            return self.keyword_enhancement(article), False
             
         except Exception as e:
             print(f"⚠️ Perplexity failed, using keyword scoring: {str(e)[:50]}")
-            keyword_score = self.calculate_keyword_score(
-                article['title'], 
-                article['summary'],
-                article.get('full_content', '')
-            )
-            return {
-                'perplexity_score': keyword_score,
+            return self.keyword_enhancement(article), False
+    
+    def enhance_batch_with_perplexity(self, articles):
+        """Score and summarize several articles in one Perplexity request; (enhancement, from_perplexity) each"""
+        listing = "\n\n".join(
+            f"[{i}] Title: {article['title']}\nSummary: {article['summary']}"
+            for i, article in enumerate(articles, 1)
+        )
+        prompt = f"""Analyze each of these articles briefly.
+
+{listing}
+
+For every article provide:
+1. Relevance score (1-10) for tech/AI/Salesforce/B2B topics
+2. Brief summary (1-2 sentences)
+
+Respond with ONLY a JSON array, one object per article:
+[{{"id": <article number>, "score": <1-10>, "summary": "<summary>"}}]
+"""
+        parsed = {}
+        try:
+            content = self.call_perplexity(prompt, max_tokens=150 * len(articles), timeout=30)
+            start, end = (content or '').find('['), (content or '').rfind(']')
+            if start != -1 and end > start:
+                for item in json.loads(content[start:end + 1]):
+                    try:
+                        parsed[int(item['id'])] = (int(item['score']), str(item.get('summary', '')).strip())
+                    except (KeyError, TypeError, ValueError):
+                        continue
+        except Exception as e:
+            print(f"⚠️ Perplexity batch failed, using keyword scoring: {str(e)[:50]}")
+        
+        # Anything the model skipped or garbled falls back to keywords on its own
+        enhancements = []
+        for i, article in enumerate(articles, 1):
+            if i in parsed:
+                score, summary = parsed[i]
+                if self.relevance_model:
+                    self.relevance_model.add_sample(article, min(max(score, 1), 10))
+                enhancements.append(({
+                    'perplexity_score': min(max(score, 1), 10),
+                    'perplexity_summary': summary if summary else article['summary']
+                }, True))
+            else:
+                enhancements.append((self.keyword_enhancement(article), False))
+        return enhancements
+    
+    def enrich_articles(self, articles, label="Added"):
+        """Add Perplexity scores to every article that doesn't have one yet"""
+        pending = [a for a in articles if 'perplexity_score' not in a]
+        if not pending:
+            return articles
+        
+        # Syndicated copies share title+summary, so each story is scored once
+        groups = {}
+        for article in pending:
+            groups.setdefault(content_hash(article['title'], article['summary']), []).append(article)
+        
+        enhancements = {}
+        if self.enrichment_cache:
+            enhancements.update(self.enrichment_cache.get_many(list(groups)))
+            self.metrics.count('enrich_cache_hit', value=len(enhancements))
+        to_score = [digest for digest in groups if digest not in enhancements]
+        
+        if self.relevance_model and to_score:
+            enhancements.update(self.score_locally(groups, to_score))
+            to_score = [digest for digest in to_score if digest not in enhancements]
+        representatives = [groups[digest][0] for digest in to_score]
+        
+        with self.metrics.stage('enrich'):
+            results = self._score_articles(representatives)
+        
+        scored = {digest: enhancement for digest, (enhancement, _) in zip(to_score, results)}
+        # Keyword fallbacks are neither cached nor stored as processed, so those
+        # stories go to Perplexity again next time instead of being skipped as unchanged
+        from_perplexity = {digest: enhancement for digest, (enhancement, ok) in zip(to_score, results) if ok}
+        fallbacks = set(scored) - set(from_perplexity)
+        if self.enrichment_cache and from_perplexity:
+            self.enrichment_cache.put_many(from_perplexity)
+        enhancements.update(scored)
+        
+        for digest, group in groups.items():
+            for article in group:
+                article.update(enhancements[digest])
+                self.metrics.count('enriched', article['source'])
+                if self.store and digest not in fallbacks:
+                    self.store.put(normalize_url(article['url']), digest, article)
+                print(f"✅ {label}: {article['title'][:50]}... (Score: {article['perplexity_score']})")
+        
+        if self.history:
+            self.history.record(pending)
+        return articles
+    
+    def score_locally(self, groups, digests):
+        """Score stories with the local model, keeping only confident predictions"""
+        with self.metrics.stage('local_score'):
+            predictions = self.relevance_model.predict([groups[digest][0] for digest in digests])
+        if predictions is None:
+            return {}
+        
+        confident = {}
+        for digest, predicted in zip(digests, predictions):
+            if LOCAL_MODEL_LOW <= predicted <= LOCAL_MODEL_HIGH:
+                continue
+            article = groups[digest][0]
+            confident[digest] = {
+                'perplexity_score': int(round(predicted)),
                 'perplexity_summary': article['summary']
             }
+        self.metrics.count('local_scored', value=len(confident))
+        self.metrics.count('local_escalated', value=len(digests) - len(confident))
+        return confident
+    
+    def _score_articles(self, articles):
+        """Run Perplexity over articles, batched or one at a time; (enhancement, from_perplexity) each"""
+        representatives = articles
+        if self.enrich_batch_size > 1:
+            batches = [
+                representatives[i:i + self.enrich_batch_size]
+                for i in range(0, len(representatives), self.enrich_batch_size)
+            ]
+            with self.thread_pool(self.enrich_concurrency) as pool:
+                results = [e for batch in pool.map(self.enhance_batch_with_perplexity, batches) for e in batch]
+        elif self.concurrent:
+            with self.thread_pool(self.enrich_concurrency) as pool:
+                results = list(pool.map(self.enhance_with_perplexity, representatives))
+        else:
+            results = [self.enhance_with_perplexity(article) for article in representatives]
+        return results
+    
+    def fetch_feed(self, source_name, feed_url):
+        """Fetch one RSS feed and return the entries worth looking at"""
+        if not self.feed_breaker.allow(feed_url):
+            print(f"⏭️ Skipping {source_name} (failing repeatedly, circuit open)")
+            # Otherwise a next_poll already in the past keeps the feed due on every scheduler tick
+            self.feed_schedule.defer(feed_url, self.feed_breaker.open_until.get(feed_url, time.time()))
+            self.metrics.count('feed_skipped', source_name)
+            return []
+        
+        print(f"📡 Fetching from {source_name}...")
+        try:
+            # Download through the cache so a 304 can reuse the stored feed body
+            with self.metrics.stage('feed_fetch', source_name):
+                body, _ = self.fetch_url(feed_url, timeout=10)
+                feed = feedparser.parse(body)
+                if feed.bozo and not feed.entries:
+                    raise ValueError(f"unreadable feed ({feed.get('bozo_exception', 'parse error')})")
+        except Exception:
+            self.feed_breaker.record_failure(feed_url)
+            self.feed_schedule.observe_failure(feed_url)
+            raise
+        self.feed_breaker.record_success(feed_url)
+        
+        ttl = feed.feed.get('ttl')
+        self.feed_schedule.observe(
+            feed_url,
+            feed.entries,
+            ttl_minutes=float(ttl) if ttl and str(ttl).strip().isdigit() else None,
+            fresh_until=self.http_cache.fresh_until(feed_url) if self.http_cache else None
+        )
+        print(f"   Found {len(feed.entries)} entries")
+        return feed.entries[:10]
+    
+    def process_rss_entry(self, source_name, entry):
+        """Filter and extract a single feed entry (None if not relevant)"""
+        title = entry.get('title', 'No Title')
+        summary = entry.get('summary', entry.get('description', 'No Summary'))
+        url = entry.get('link', '#')
+        
+        with self.metrics.stage('filter', source_name):
+            is_relevant = self.filter_relevant_content(title, summary)
+        if not is_relevant:
+            self.metrics.count('filtered_out', source_name)
+            return None
+        
+        summary = summary[:400] + '...' if len(summary) > 400 else summary
+        
+        # Unchanged articles from earlier cycles skip extraction and Perplexity
+        if self.store:
+            stored = self.store.get(normalize_url(url), content_hash(title, summary))
+            if stored:
+                self.metrics.count('unchanged', source_name)
+                print(f"♻️ Unchanged: {title[:50]}... (Score: {stored.get('perplexity_score')})")
+                return Article.from_dict(stored, self.content_spill)
+        
+        with self.metrics.stage('extract', source_name):
+            extra_content = self.extract_simple_content(url)
+        if not extra_content:
+            self.metrics.count('extract_empty', source_name)
+        
+        return Article(
+            self.content_spill,
+            source=source_name,
+            title=title,
+            summary=summary,
+            full_content=extra_content,
+            url=url,
+            published_date=entry.get('published', 'Unknown'),
+            scrape_time=self.scrape_time
+        )
     
-    def scrape_rss_feeds(self):
-        """RSS scraping with keyword filtering"""
+    def scrape_rss_feeds(self, sources=None):
+        """RSS scraping with keyword filtering (all feeds unless `sources` is given)"""
+        sources = self.rss_sources if sources is None else sources
+        if self.concurrent:
+            return self.enrich_articles(self.scrape_rss_feeds_concurrent(sources))
+        
         articles = []
         
-        for source_name, feed_url in self.rss_sources.items():
-            print(f"📡 Fetching from {source_name}...")
+        for source_name, feed_url in sources.items():
             try:
-                feed = feedparser.parse(feed_url)
-                print(f"   Found {len(feed.entries)} entries")
+                entries = self.fetch_feed(source_name, feed_url)
                 
-                for entry in feed.entries[:10]:
+                for entry in entries:
                     try:
-                        title = entry.get('title', 'No Title')
-                        summary = entry.get('summary', entry.get('description', 'No Summary'))
-                        url = entry.get('link', '#')
-                        
-                        if self.filter_relevant_content(title, summary):
-                            extra_content = self.extract_simple_content(url)
-                            
-                            article = {
-                                'source': source_name,
-                                'title': title,
-                                'summary': summary[:400] + '...' if len(summary) > 400 else summary,
-                                'full_content': extra_content,
-                                'url': url,
-                                'published_date': entry.get('published', 'Unknown'),
-                                'scrape_time': datetime.now().isoformat()
-                            }
-                            
-                            enhancement = self.enhance_with_perplexity(article)
-                            article.update(enhancement)
-                            
+                        article = self.process_rss_entry(source_name, entry)
+                        if article:
                             articles.append(article)
-                            print(f"✅ Added: {title[:50]}... (Score: {article['perplexity_score']})")
-                            time.sleep(1)
                     
                     except Exception as e:
                         print(f"❌ Error processing article: {str(e)}")
@@ -301,14 +2181,52 @@ Format: "Score: X | Summary: Your summary here"
             except Exception as e:
                 print(f"❌ Error with feed {source_name}: {str(e)}")
                 continue
+        
+        return self.enrich_articles(articles)
+    
+    def scrape_rss_feeds_concurrent(self, sources=None):
+        """Fetch feeds and article pages in parallel (enrichment happens afterwards)"""
+        sources = self.rss_sources if sources is None else sources
+        results = {}
+        
+        with self.thread_pool(self.max_workers) as pool:
+            feed_jobs = {
+                pool.submit(self.fetch_feed, source_name, feed_url): (feed_index, source_name)
+                for feed_index, (source_name, feed_url) in enumerate(sources.items())
+            }
+            entry_jobs = {}
+            
+            # Start on a feed's articles as soon as that feed arrives
+            for job in as_completed(feed_jobs):
+                feed_index, source_name = feed_jobs[job]
+                try:
+                    entries = job.result()
+                except Exception as e:
+                    print(f"❌ Error with feed {source_name}: {str(e)}")
+                    continue
+                
+                for entry_index, entry in enumerate(entries):
+                    entry_job = pool.submit(self.process_rss_entry, source_name, entry)
+                    entry_jobs[entry_job] = (feed_index, entry_index)
             
-            time.sleep(2)
+            for job in as_completed(entry_jobs):
+                try:
+                    article = job.result()
+                except Exception as e:
+                    print(f"❌ Error processing article: {str(e)}")
+                    continue
+                if article:
+                    results[entry_jobs[job]] = article
         
-        return articles
+        # Keep the same feed/entry order as the serial mode
+        return [results[key] for key in sorted(results)]
     
     def scrape_news_apis(self):
         """API scraping"""
-        articles = []
+        return self.enrich_articles(list(self.iter_api_articles()), label="API Article")
+    
+    def iter_api_articles(self):
+        """Yield relevant news-API articles (stored ones already scored, new ones not yet)"""
         search_terms = [
             'artificial intelligence business',
             'salesforce enterprise',
@@ -324,130 +2242,466 @@ Format: "Score: X | Summary: Your summary here"
                 params['q'] = term
                 params['size'] = 5
                 
-                response = requests.get(
-                    self.api_sources['newsdata_io']['url'],
-                    params=params,
-                    timeout=10
-                )
+                api_url = self.api_sources['newsdata_io']['url']
+                with self.metrics.stage('api_fetch', 'newsdata_io'), self.host_slot(api_url):
+                    response = self.session.get(api_url, params=params, timeout=10)
+                    # Count error statuses as failed fetches, not as searches with no results
+                    response.raise_for_status()
                 
                 if response.status_code == 200:
                     data = response.json()
                     for item in data.get('results', []):
-                        title = item.get('title', 'No Title')
-                        description = item.get('description', 'No Description')
+                        # newsdata.io sends null for missing fields, so .get() defaults alone aren't enough
+                        title = item.get('title') or 'No Title'
+                        description = item.get('description') or 'No Description'
                         
                         if self.filter_relevant_content(title, description):
-                            article = {
-                                'source': f"NewsAPI - {item.get('source_id', 'Unknown')}",
-                                'title': title,
-                                'summary': description[:400] + '...' if len(description) > 400 else description,
-                                'full_content': description,
-                                'url': item.get('link', '#'),
-                                'published_date': item.get('pubDate', 'Unknown'),
-                                'scrape_time': datetime.now().isoformat()
-                            }
+                            summary = description[:400] + '...' if len(description) > 400 else description
+                            url = item.get('link') or '#'
                             
-                            enhancement = self.enhance_with_perplexity(article)
-                            article.update(enhancement)
+                            stored = self.store.get(normalize_url(url), content_hash(title, summary)) if self.store else None
+                            if stored:
+                                print(f"♻️ Unchanged API Article: {title[:50]}...")
+                                yield Article.from_dict(stored, self.content_spill)
+                                continue
                             
-                            articles.append(article)
-                            print(f"✅ API Article: {title[:50]}... (Score: {article['perplexity_score']})")
-                            time.sleep(3)
+                            yield Article(
+                                self.content_spill,
+                                source=f"NewsAPI - {item.get('source_id') or 'Unknown'}",
+                                title=title,
+                                summary=summary,
+                                full_content=description,
+                                url=url,
+                                published_date=item.get('pubDate') or 'Unknown',
+                                scrape_time=self.scrape_time
+                            )
             
             except Exception as e:
                 print(f"❌ API Error: {str(e)}")
                 continue
+    
+    def run_pipeline(self, sources=None, include_api=True):
+        """Stream articles through fetch → filter/extract → enrich → dedup/top-K.
         
-        return articles
+        Each stage runs in its own threads, connected by bounded queues, so
+        enrichment starts as soon as the first article is extracted and memory
+        stays bounded by the queue sizes plus the top-K, not the feed count.
+        """
+        sources = self.rss_sources if sources is None else sources
+        entries = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        to_enrich = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        finished = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        done = object()
+        
+        self.dedup_index.reset()
+        top = TopArticles(self.dedup_index)
+        counts = {'rss': 0, 'api': 0, 'total': 0}
+        counts_lock = threading.Lock()
+        
+        def tally(key):
+            # Extract workers and the API producer count concurrently
+            with counts_lock:
+                counts[key] += 1
+        
+        def rss_producer():
+            with self.thread_pool(self.max_workers) as pool:
+                jobs = {pool.submit(self.fetch_feed, name, url): name for name, url in sources.items()}
+                for job in as_completed(jobs):
+                    try:
+                        for entry in job.result():
+                            entries.put((jobs[job], entry))
+                    except Exception as e:
+                        print(f"❌ Error with feed {jobs[job]}: {str(e)}")
+        
+        def api_producer():
+            if not include_api:
+                return
+            try:
+                for article in self.iter_api_articles():
+                    tally('api')
+                    (finished if 'perplexity_score' in article else to_enrich).put(article)
+            except Exception as e:
+                print(f"❌ API Error: {str(e)}")
+        
+        def extract_worker():
+            while True:
+                item = entries.get()
+                if item is done:
+                    return
+                try:
+                    article = self.process_rss_entry(*item)
+                    if article:
+                        tally('rss')
+                        (finished if 'perplexity_score' in article else to_enrich).put(article)
+                except Exception as e:
+                    print(f"❌ Error processing article: {str(e)}")
+        
+        def enrich_worker():
+            while True:
+                batch, closing = [to_enrich.get()], False
+                if batch[0] is done:
+                    return
+                # Top the batch up with whatever arrives within the wait window
+                deadline = time.monotonic() + PIPELINE_BATCH_WAIT
+                while len(batch) < self.enrich_batch_size:
+                    try:
+                        item = to_enrich.get(timeout=max(0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is done:
+                        closing = True
+                        break
+                    batch.append(item)
+                try:
+                    self.enrich_articles(batch)
+                except Exception as e:
+                    print(f"❌ Error enriching articles: {str(e)}")
+                for article in batch:
+                    try:
+                        if 'perplexity_score' not in article:
+                            article.update(self.keyword_enhancement(article))
+                        finished.put(article)
+                    except Exception as e:
+                        print(f"❌ Dropping unscoreable article: {str(e)}")
+                if closing:
+                    return
+        
+        def offer(article):
+            # A bad article must not kill the sink: upstream stages would block on a full queue
+            tally('total')
+            try:
+                with self.metrics.stage('dedup'):
+                    top.offer(article)
+            except Exception as e:
+                print(f"❌ Error ranking article: {str(e)}")
+        
+        def sink():
+            while True:
+                article = finished.get()
+                if article is done:
+                    break
+                offer(article)
+            
+            # Everything from this cycle is in; fill in recent articles it didn't see again
+            if self.store:
+                try:
+                    since = time.time() - MERGE_WINDOW_HOURS * 3600
+                    previous = [
+                        Article.from_dict(a, self.content_spill)
+                        for a in self.store.recent(since) if normalize_url(a['url']) not in top.seen_urls
+                    ]
+                    if previous:
+                        print(f"♻️ Merged {len(previous)} articles from earlier cycles")
+                    for article in previous:
+                        offer(article)
+                    self.store.prune(time.time() - STORE_RETENTION_DAYS * 86400)
+                except Exception as e:
+                    print(f"❌ Error merging earlier articles: {str(e)}")
+        
+        def profiled(target):
+            # Same per-thread profiler hook as thread_pool, so SCRAPER_PROFILE covers every stage
+            def run():
+                self._start_worker_profiler()
+                target()
+            return run
+        
+        def start(target, count=1):
+            threads = [threading.Thread(target=profiled(target), daemon=True) for _ in range(count)]
+            for thread in threads:
+                thread.start()
+            return threads
+        
+        sink_threads = start(sink)
+        enrich_threads = start(enrich_worker, self.enrich_concurrency)
+        extract_threads = start(extract_worker, self.max_workers)
+        producer_threads = start(rss_producer) + start(api_producer)
+        
+        # Shut down stage by stage once everything upstream has drained
+        for thread in producer_threads:
+            thread.join()
+        for _ in extract_threads:
+            entries.put(done)
+        for thread in extract_threads:
+            thread.join()
+        for _ in enrich_threads:
+            to_enrich.put(done)
+        for thread in enrich_threads:
+            thread.join()
+        
+        finished.put(done)
+        for thread in sink_threads:
+            thread.join()
+        
+        self.dedup_index.persist()
+        print(f"RSS Articles collected: {counts['rss']}")
+        print(f"API Articles collected: {counts['api']}")
+        return top.results(), counts['total']
+    
+    def merge_previous_articles(self, current_articles):
+        """Recently processed articles that weren't picked up again this cycle"""
+        seen = {normalize_url(a['url']) for a in current_articles}
+        since = time.time() - MERGE_WINDOW_HOURS * 3600
+        previous = [
+            Article.from_dict(a, self.content_spill)
+            for a in self.store.recent(since) if normalize_url(a['url']) not in seen
+        ]
+        if previous:
+            print(f"♻️ Merged {len(previous)} articles from earlier cycles")
+        return previous
     
     def remove_duplicates_and_sort(self, articles):
-        """Remove duplicates and sort by SCORE (highest first)"""
+        """Remove near-duplicates and sort by SCORE (highest first)"""
+        # Highest score first, so the best-scoring copy of a story is the one kept
+        ranked = sorted(articles, key=lambda x: x.get('perplexity_score', 5), reverse=True)
+        
+        self.dedup_index.reset()
         unique_articles = []
-        seen_titles = set()
         
-        for article in articles:
-            title_words = set(article['title'].lower().split())
-            is_duplicate = False
+        for article in ranked:
+            url_key = normalize_url(article['url'])
+            score = article.get('perplexity_score', 5)
+            title_sig, content_sig = self.dedup_index.signatures(article)
             
-            for seen_title in seen_titles:
-                seen_words = set(seen_title.split())
-                if len(title_words.intersection(seen_words)) >= 3:
-                    is_duplicate = True
-                    break
+            if self.dedup_index.find_duplicate(url_key, title_sig, content_sig):
+                continue
             
-            if not is_duplicate:
-                unique_articles.append(article)
-                seen_titles.add(article['title'].lower())
-        
-        # Sort by score (HIGHEST FIRST)
-        unique_articles.sort(
-            key=lambda x: x.get('perplexity_score', 5),
-            reverse=True
-        )
+            self.dedup_index.add(url_key, title_sig, content_sig, score)
+            unique_articles.append(article)
         
-        return unique_articles[:50]
+        self.dedup_index.persist()
+        return unique_articles[:MAX_OUTPUT_ARTICLES]
     
     def save_articles(self, articles):
-        """Save articles to hybrid_tech_news.txt (overwrites each time)"""
+        """Save articles to public/hybrid_tech_news.* (overwrites each time)"""
         public_dir = "public"
         if not os.path.exists(public_dir):
             os.makedirs(public_dir)
             print(f"📁 Created '{public_dir}' directory")
         
-        # Always use the same filename
-        filename = os.path.join(public_dir, "hybrid_tech_news.txt")
+        generated_at = datetime.now()
+        scores = [a.get('perplexity_score', 5) for a in articles]
+        cycle = {
+            'generated_at': generated_at.isoformat(),
+            'total_articles': len(articles),
+            'sources': len(set(a['source'] for a in articles)),
+            'average_score': round(sum(scores) / len(scores), 1) if scores else 0
+        }
+        # The version travels inside the outputs, so a client never pairs items with another cycle's version
+        snapshot_index, cycle['version'] = self.snapshot_index(articles)
+        
+        writers = {
+            'txt': ("hybrid_tech_news.txt", self.format_text),
+            'json': ("hybrid_tech_news.json", self.format_json),
+            'ndjson': ("hybrid_tech_news.ndjson", self.format_ndjson),
+        }
+        
+        saved = {}
+        for fmt in OUTPUT_FORMATS:
+            if fmt not in writers:
+                print(f"⚠️ Unknown output format '{fmt}', skipping")
+                continue
+            name, formatter = writers[fmt]
+            filename = os.path.join(public_dir, name)
+            saved[filename] = formatter(articles, cycle).encode('utf-8')
+            atomic_write(filename, saved[filename])
+            print(f"💾 Articles saved to: {filename}")
+        
+        if SNAPSHOTS_ENABLED:
+            self.write_snapshots(public_dir, saved, articles, cycle, snapshot_index)
         
+        return next(iter(saved), None)
+    
+    def snapshot_index(self, articles):
+        """Per-article score and digest of everything a delta can update, plus the version they hash to"""
+        current = {
+            normalize_url(a['url']): {
+                'url': a['url'],
+                'score': a.get('perplexity_score', 5),
+                'digest': content_hash(
+                    a['url'], a['title'], a['summary'], a.get('perplexity_summary') or '',
+                    a['source'], str(a.get('published_date'))
+                )
+            }
+            for a in articles
+        }
+        version = content_hash(json.dumps(sorted(
+            (key, entry['score'], entry['digest']) for key, entry in current.items()
+        )))[:16]
+        return current, version
+    
+    def write_snapshots(self, public_dir, saved, articles, cycle, current):
+        """Precompress the outputs and publish a version file plus the delta from the last cycle"""
+        version = cycle['version']
+        
+        try:
+            with open(SNAPSHOT_INDEX_PATH, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            previous = {'version': None, 'articles': {}}
+        
+        before = previous['articles']
+        changed = {
+            key for key, entry in current.items()
+            if key in before and before[key].get('digest') != entry['digest']
+        }
+        delta = {
+            'from_version': previous['version'],
+            'to_version': version,
+            'generated_at': cycle['generated_at'],
+            'added': [dict(a) for a in articles if normalize_url(a['url']) not in before],
+            'removed': [entry['url'] for key, entry in before.items() if key not in current],
+            # Text changed at the same URL: the whole article, replacing the client's copy
+            'updated': [dict(a) for a in articles if normalize_url(a['url']) in changed],
+            'rescored': [
+                {'url': entry['url'], 'old_score': before[key]['score'], 'score': entry['score']}
+                for key, entry in current.items()
+                if key in before and key not in changed and before[key]['score'] != entry['score']
+            ]
+        }
+        saved[os.path.join(public_dir, "hybrid_tech_news.delta.json")] = json.dumps(delta, ensure_ascii=False).encode('utf-8')
+        
+        files = {}
+        for filename, data in saved.items():
+            if filename.endswith('.delta.json'):
+                atomic_write(filename, data)
+            files[os.path.basename(filename)] = dict(
+                precompress(filename, data), bytes=len(data), sha256=hashlib.sha256(data).hexdigest()
+            )
+        
+        manifest = {'version': version, 'previous_version': previous['version'], 'cycle': cycle, 'files': files}
+        atomic_write(os.path.join(public_dir, "hybrid_tech_news.version.json"), json.dumps(manifest, indent=1).encode('utf-8'))
+        
+        os.makedirs(os.path.dirname(SNAPSHOT_INDEX_PATH) or '.', exist_ok=True)
+        atomic_write(SNAPSHOT_INDEX_PATH, json.dumps({'version': version, 'articles': current}).encode('utf-8'))
+        print(f"🗜️ Snapshot {version}: +{len(delta['added'])} -{len(delta['removed'])} "
+              f"*{len(delta['updated'])} ~{len(delta['rescored'])} since {previous['version'] or 'first run'}")
+    
+    def format_text(self, articles, cycle):
+        """Legacy human-readable report"""
         # Use Unix line endings
-        with open(filename, 'w', encoding='utf-8', newline='\n') as f:
-            f.write(f"HYBRID TECH NEWS SCRAPER RESULTS - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 100 + "\n")
-            f.write(f"Total Articles: {len(articles)} | Sources: {len(set(a['source'] for a in articles))}\n")
+        f = io.StringIO(newline='\n')
+        generated_at = datetime.fromisoformat(cycle['generated_at'])
+        f.write(f"HYBRID TECH NEWS SCRAPER RESULTS - {generated_at.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write("=" * 100 + "\n")
+        f.write(f"Total Articles: {cycle['total_articles']} | Sources: {cycle['sources']}\n")
+        f.write(f"Average Relevance Score: {cycle['average_score']:.1f}/10\n")
+        f.write("=" * 100 + "\n\n")
+        
+        for i, article in enumerate(articles, 1):
+            f.write(f"ARTICLE #{i}\n")
+            f.write("-" * 80 + "\n")
+            f.write(f"TITLE: {article['title']}\n")
+            f.write(f"SOURCE: {article['source']}\n")
+            f.write(f"PUBLISHED: {article['published_date']}\n")
+            f.write(f"URL: {article['url']}\n")
+            f.write(f"PERPLEXITY SCORE: {article.get('perplexity_score', 'N/A')}/10\n")
+            f.write(f"\nSUMMARY:\n{article.get('perplexity_summary', article['summary'])}\n")
             
-            scores = [a.get('perplexity_score', 5) for a in articles]
-            avg_score = sum(scores) / len(scores) if scores else 0
-            f.write(f"Average Relevance Score: {avg_score:.1f}/10\n")
-            f.write("=" * 100 + "\n\n")
+            if article.get('full_content'):
+                f.write(f"\nCONTENT PREVIEW:\n{article['full_content'][:800]}{'...' if len(article['full_content']) > 800 else ''}\n")
             
-            for i, article in enumerate(articles, 1):
-                f.write(f"ARTICLE #{i}\n")
-                f.write("-" * 80 + "\n")
-                f.write(f"TITLE: {article['title']}\n")
-                f.write(f"SOURCE: {article['source']}\n")
-                f.write(f"PUBLISHED: {article['published_date']}\n")
-                f.write(f"URL: {article['url']}\n")
-                f.write(f"PERPLEXITY SCORE: {article.get('perplexity_score', 'N/A')}/10\n")
-                f.write(f"\nSUMMARY:\n{article.get('perplexity_summary', article['summary'])}\n")
-                
-                if article.get('full_content'):
-                    f.write(f"\nCONTENT PREVIEW:\n{article['full_content'][:800]}{'...' if len(article['full_content']) > 800 else ''}\n")
-                
-                f.write("\n" + "=" * 100 + "\n\n")
+            f.write("\n" + "=" * 100 + "\n\n")
+        
+        return f.getvalue()
+    
+    def format_json(self, articles, cycle):
+        """Single JSON document: cycle metadata plus the article list"""
+        return json.dumps({'cycle': cycle, 'articles': [dict(a) for a in articles]}, ensure_ascii=False, indent=1)
+    
+    def format_ndjson(self, articles, cycle):
+        """Cycle metadata on the first line, then one article per line"""
+        lines = [json.dumps(dict(cycle, type='cycle'), ensure_ascii=False)]
+        lines.extend(json.dumps(dict(a, type='article'), ensure_ascii=False) for a in articles)
+        return '\n'.join(lines) + '\n'
+    
+    def run_scraping_cycle(self, sources=None, include_api=True):
+        """Complete hybrid scraping cycle (optionally for a subset of feeds); returns the number saved"""
+        self.metrics = CycleMetrics()
         
-        print(f"💾 Articles saved to: {filename}")
-        return filename
+        profiler = None
+        if PROFILE_ENABLED:
+            profiler = cProfile.Profile()
+            self._profilers = []
+            profiler.enable()
+        
+        try:
+            with self.metrics.stage('cycle'):
+                return self._run_cycle_phases(sources, include_api)
+        finally:
+            if profiler:
+                profiler.disable()
+                self.dump_profile(profiler)
+            self.metrics.export(METRICS_DIR)
+            print(f"📊 Metrics written to: {METRICS_DIR}/scraper_metrics.prom")
     
-    def run_scraping_cycle(self):
-        """Complete hybrid scraping cycle"""
+    def dump_profile(self, profiler):
+        """Merge main-thread and worker profiles into one .prof file"""
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"cycle_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+        stats = pstats.Stats(profiler)
+        for worker_profiler in self._profilers:
+            worker_profiler.disable()
+            stats.add(worker_profiler)
+        self._profilers = None
+        stats.dump_stats(path)
+        print(f"🔬 Profile written to: {path}")
+    
+    def start_cycle(self):
+        """Fresh scrape_time and content budget for the articles of a new cycle"""
+        self.scrape_time = datetime.now().isoformat()
+        self.content_spill.reset()
+        if self.relevance_model:
+            # Retrain here, before the enrich workers start, rather than inside them
+            self.relevance_model.maybe_refit()
+    
+    def _run_cycle_phases(self, sources=None, include_api=True):
+        self.start_cycle()
         print(f"🚀 Starting hybrid news scraping at {datetime.now().strftime('%H:%M:%S')}")
+        if sources is not None:
+            print(f"🎯 Polling {len(sources)} of {len(self.rss_sources)} feeds{' + news APIs' if include_api else ''}")
         print("=" * 80)
         
+        if self.concurrent and PIPELINE_ENABLED:
+            print("\n🚰 Streaming pipeline: fetch → filter/extract → enrich → dedup")
+            final_articles, collected = self.run_pipeline(sources, include_api)
+            self.metrics.count('articles_collected', value=collected)
+            return self.finish_cycle(final_articles)
+        
         all_articles = []
         
         print("\n📡 Phase 1: RSS Feed Scraping")
-        rss_articles = self.scrape_rss_feeds()
+        rss_articles = self.scrape_rss_feeds(sources)
         all_articles.extend(rss_articles)
         print(f"RSS Articles collected: {len(rss_articles)}")
         
-        print("\n🔍 Phase 2: API Scraping")
-        api_articles = self.scrape_news_apis()
-        all_articles.extend(api_articles)
-        print(f"API Articles collected: {len(api_articles)}")
+        if include_api:
+            print("\n🔍 Phase 2: API Scraping")
+            api_articles = self.scrape_news_apis()
+            all_articles.extend(api_articles)
+            print(f"API Articles collected: {len(api_articles)}")
+        
+        if self.store:
+            all_articles.extend(self.merge_previous_articles(all_articles))
+            self.store.prune(time.time() - STORE_RETENTION_DAYS * 86400)
         
         print(f"\n🔄 Phase 3: Processing {len(all_articles)} articles")
-        final_articles = self.remove_duplicates_and_sort(all_articles)
+        with self.metrics.stage('dedup'):
+            final_articles = self.remove_duplicates_and_sort(all_articles)
         
+        self.metrics.count('articles_collected', value=len(all_articles))
+        return self.finish_cycle(final_articles)
+    
+    def finish_cycle(self, final_articles):
+        """Save the cycle's top articles and print the summary"""
         print(f"\n💾 Phase 4: Saving {len(final_articles)} articles")
-        filename = self.save_articles(final_articles)
+        with self.metrics.stage('save'):
+            filename = self.save_articles(final_articles)
+        
+        self.metrics.count('articles_saved', value=len(final_articles))
+        if self.history and HISTORY_RETENTION_DAYS > 0:
+            self.history.prune(time.time() - HISTORY_RETENTION_DAYS * 86400)
+        if self.http_cache:
+            self.http_cache.prune(time.time() - HTTP_CACHE_MAX_DAYS * 86400, int(HTTP_CACHE_MAX_MB * 1024 * 1024))
         
         print("\n" + "=" * 80)
         print(f"✅ SCRAPING COMPLETE!")
@@ -460,15 +2714,314 @@ Format: "Score: X | Summary: Your summary here"
         
         print(f"💾 Saved to: {filename}")
         print("=" * 80)
+        return len(final_articles)
+
+def history_query_args(params):
+    """Map search parameters (CLI or query string) onto ArticleHistory.query arguments"""
+    def day(value):
+        if not value:
+            return None
+        timestamp = published_timestamp(value)
+        if timestamp is None:
+            # Dropping the filter would silently return the whole history
+            raise ValueError(f"unrecognised date: {value!r} (expected YYYY-MM-DD)")
+        return timestamp
+    def number(value):
+        return int(value) if value not in (None, '') else None
+    return {
+        'text': params.get('q') or None,
+        'source': params.get('source') or None,
+        'since': day(params.get('since')),
+        'until': day(params.get('until')),
+        'min_score': number(params.get('min_score')),
+        'max_score': number(params.get('max_score')),
+        'page': number(params.get('page')) or 1,
+        'per_page': number(params.get('per_page')) or HISTORY_PAGE_SIZE
+    }
+
+def serve_history(port, host='127.0.0.1'):
+    """Serve GET /articles?q=&source=&since=&until=&min_score=&max_score=&page=&per_page= as JSON"""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    
+    history = ArticleHistory(STORE_PATH)
+    
+    class HistoryRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path.rstrip('/') != '/articles':
+                self.send_error(404)
+                return
+            try:
+                result = history.query(**history_query_args(dict(parse_qsl(parsed.query))))
+            except ValueError as e:
+                self.send_error(400, str(e))
+                return
+            body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer((host, port), HistoryRequestHandler)
+    print(f"🔎 History API on http://{host}:{port}/articles")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 History API stopped")
+    finally:
+        server.server_close()
+
+def run_shard(cycle_id, shard, shard_count, shard_dir, scraper=None):
+    """Scrape one shard of the sources and write its articles to the shared directory"""
+    scraper = scraper or HybridNewsScraper()
+    sources = shard_sources(scraper.rss_sources, shard_count)[shard]
+    print(f"🧩 Shard {shard + 1}/{shard_count} of cycle {cycle_id}: {len(sources)} feeds")
+    
+    scraper.metrics = CycleMetrics()
+    scraper.start_cycle()
+    articles = scraper.scrape_rss_feeds(sources)
+    if shard == 0:
+        articles.extend(scraper.scrape_news_apis())
+    
+    partial_dir = os.path.join(shard_dir, cycle_id)
+    os.makedirs(partial_dir, exist_ok=True)
+    atomic_write(
+        os.path.join(partial_dir, f"shard-{shard}.json"),
+        json.dumps({
+            'shard': shard,
+            'articles': [dict(a) for a in articles],
+            'fetches': scraper.metrics.fetch_stats()
+        }).encode('utf-8')
+    )
+    scraper.metrics.export(os.path.join(METRICS_DIR, f"shard-{shard}"))
+    return len(articles)
+
+def shard_worker_loop(shard_dir=SHARD_DIR, cycle_id=None, forever=False):
+    """Claim and run shards until none are left (or, with `forever`, keep waiting for more)"""
+    leases = ShardLeases(os.path.join(shard_dir, 'leases.db'))
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    scraper = HybridNewsScraper()
+    
+    while True:
+        claimed = leases.claim(owner, SHARD_LEASE_MINUTES * 60, cycle_id)
+        if claimed is None:
+            if not forever:
+                return
+            time.sleep(5)
+            continue
+        
+        run_claimed_shard(leases, claimed, shard_dir, scraper)
+
+def run_claimed_shard(leases, claimed, shard_dir, scraper):
+    """Run a leased shard, releasing it for a retry if it fails"""
+    claimed_cycle, shard, shard_count = claimed
+    try:
+        run_shard(claimed_cycle, shard, shard_count, shard_dir, scraper)
+        leases.complete(claimed_cycle, shard)
+    except Exception as e:
+        print(f"❌ Shard {shard} of {claimed_cycle} failed: {str(e)}")
+        leases.release(claimed_cycle, shard)
+
+def run_sharded_cycle(scraper, shard_count=SHARD_COUNT, local_workers=None, shard_dir=SHARD_DIR):
+    """Coordinate one cycle split over worker processes, then merge, dedup and save"""
+    cycle_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+    leases = ShardLeases(os.path.join(shard_dir, 'leases.db'))
+    leases.create_cycle(cycle_id, shard_count)
+    
+    local_workers = shard_count if local_workers is None else local_workers
+    print(f"🧩 Cycle {cycle_id}: {shard_count} shards, {local_workers} local workers")
+    
+    partial_dir = os.path.join(shard_dir, cycle_id)
+    try:
+        # Spawn rather than fork: the parent already holds sessions and thread pools
+        context = multiprocessing.get_context('spawn')
+        workers = [
+            context.Process(target=shard_worker_loop, args=(shard_dir, cycle_id))
+            for _ in range(local_workers)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        
+        # Whatever is left was leased by a remote worker or released after a failure
+        while leases.pending(cycle_id):
+            claimed = leases.claim(f"{socket.gethostname()}:{os.getpid()}", SHARD_LEASE_MINUTES * 60, cycle_id)
+            if claimed:
+                run_claimed_shard(leases, claimed, shard_dir, scraper)
+            else:
+                time.sleep(5)
+        
+        failed = leases.failed(cycle_id)
+        if failed:
+            print(f"⚠️ Giving up on shard(s) {', '.join(map(str, failed))} after {SHARD_MAX_ATTEMPTS} attempts")
+        
+        scraper.start_cycle()
+        scraper.metrics = CycleMetrics()
+        all_articles = []
+        for path in sorted(glob.glob(os.path.join(partial_dir, 'shard-*.json'))):
+            with open(path, 'r', encoding='utf-8') as f:
+                partial = json.load(f)
+            all_articles.extend(Article.from_dict(a, scraper.content_spill) for a in partial['articles'])
+            # The shards did the fetching; their stats tell run_once whether any source answered
+            scraper.metrics.merge(partial.get('fetches', {}))
+        print(f"🧩 Merged {len(all_articles)} articles from {shard_count - len(failed)} of {shard_count} shards")
+        
+        with scraper.metrics.stage('cycle'):
+            if scraper.store:
+                all_articles.extend(scraper.merge_previous_articles(all_articles))
+                scraper.store.prune(time.time() - STORE_RETENTION_DAYS * 86400)
+            with scraper.metrics.stage('dedup'):
+                final_articles = scraper.remove_duplicates_and_sort(all_articles)
+            scraper.metrics.count('articles_collected', value=len(all_articles))
+            scraper.metrics.count('shards_failed', value=len(failed))
+            saved = scraper.finish_cycle(final_articles)
+        scraper.metrics.export(METRICS_DIR)
+        return saved
+    finally:
+        for path in glob.glob(os.path.join(partial_dir, '*')):
+            os.remove(path)
+        if os.path.isdir(partial_dir):
+            os.rmdir(partial_dir)
+        leases.forget(cycle_id)
 
-def main():
-    """Main function with scheduling"""
+def run_adaptive_scheduler(scraper):
+    """Poll each feed when it is due; the output is refreshed after every poll round"""
+    if not scraper.store:
+        print("⚠️ Incremental store is off - each update will only contain the feeds just polled")
+    
+    print("\n⏰ Adaptive scheduler started - each feed is polled on its own interval")
+    print("Press Ctrl+C to stop")
+    
+    last_api_poll = 0
+    try:
+        while True:
+            now = time.time()
+            due = scraper.feed_schedule.due(scraper.rss_sources, now)
+            api_due = now - last_api_poll >= API_POLL_MINUTES * 60
+            
+            if due or api_due:
+                scraper.run_scraping_cycle(sources=due, include_api=api_due)
+                if api_due:
+                    last_api_poll = now
+            
+            wake_at = min(scraper.feed_schedule.next_poll(scraper.rss_sources), last_api_poll + API_POLL_MINUTES * 60)
+            time.sleep(min(max(wake_at - time.time(), 5), 60))
+    except KeyboardInterrupt:
+        print("\n🛑 Scheduler stopped")
+
+# Exit codes for one-shot runs (argparse itself exits with 2 on bad arguments)
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_NO_ARTICLES = 3
+EXIT_SOURCES_FAILED = 4
+
+def run_once(cycle, scraper):
+    """Run a single cycle for cron/containers and turn its outcome into an exit code"""
+    try:
+        saved = cycle()
+    except Exception as e:
+        print(f"❌ Cycle failed: {str(e)}")
+        return EXIT_FAILED
+    # Merged articles from earlier cycles can still be saved when every source is down
+    if scraper.metrics.sources_failed():
+        print("❌ No feed or API search succeeded this cycle")
+        return EXIT_SOURCES_FAILED
+    return EXIT_OK if saved else EXIT_NO_ARTICLES
+
+def main(argv=None):
+    """Command-line entry point; returns the process exit code"""
+    parser = argparse.ArgumentParser(description="Hybrid tech news scraper")
+    parser.add_argument('--once', action='store_true',
+                        help='run a single cycle and exit (0 = saved articles, 1 = failed, 3 = nothing saved, '
+                             '4 = every source failed)')
+    parser.add_argument('--sources', metavar='NAMES',
+                        help='with --once: comma-separated feed names to poll instead of all feeds')
+    parser.add_argument('--no-api', action='store_true',
+                        help='with --once: skip the news API searches')
+    parser.add_argument('--shards', type=int, default=SHARD_COUNT,
+                        help='split feeds into this many shards, one worker process each')
+    parser.add_argument('--local-workers', type=int, default=None,
+                        help='worker processes to start on this host (default: one per shard)')
+    parser.add_argument('--shard-dir', default=SHARD_DIR,
+                        help='directory shared by all hosts for leases and partial results')
+    parser.add_argument('--worker', action='store_true',
+                        help='only run shards claimed from --shard-dir (for extra hosts)')
+    
+    history = parser.add_argument_group('article history')
+    history.add_argument('--search', metavar='TEXT', nargs='?', const='',
+                         help='print matching articles from the history as JSON and exit')
+    history.add_argument('--source', help='only articles from this source')
+    history.add_argument('--since', help='published on or after this date (YYYY-MM-DD)')
+    history.add_argument('--until', help='published before this date (YYYY-MM-DD)')
+    history.add_argument('--min-score', type=int)
+    history.add_argument('--max-score', type=int)
+    history.add_argument('--page', type=int, default=1)
+    history.add_argument('--per-page', type=int, default=HISTORY_PAGE_SIZE)
+    history.add_argument('--serve-history', metavar='PORT', type=int,
+                         help='serve the history query API on this port')
+    args = parser.parse_args(argv)
+    
+    if (args.sources or args.no_api) and not args.once:
+        parser.error("--sources and --no-api only apply to --once runs")
+    if args.sources and args.shards > 1:
+        parser.error("--sources can't be combined with --shards")
+    
+    if args.serve_history:
+        serve_history(args.serve_history)
+        return EXIT_OK
+    
+    if args.search is not None:
+        params = dict(vars(args), q=args.search)
+        try:
+            query = history_query_args(params)
+        except ValueError as e:
+            parser.error(str(e))
+        result = ArticleHistory(STORE_PATH).query(**query)
+        print(json.dumps(result, ensure_ascii=False, indent=1))
+        return EXIT_OK
+    
+    if args.worker:
+        print(f"🧩 Shard worker waiting for work in {args.shard_dir}")
+        try:
+            shard_worker_loop(args.shard_dir, forever=True)
+        except KeyboardInterrupt:
+            print("\n🛑 Worker stopped")
+        return EXIT_OK
+    
     scraper = HybridNewsScraper()
     
+    sources = None
+    if args.sources:
+        by_name = {name.lower(): name for name in scraper.rss_sources}
+        wanted = [name.strip().lower() for name in args.sources.split(',') if name.strip()]
+        unknown = [name for name in wanted if name not in by_name]
+        if unknown:
+            parser.error(f"unknown feed(s): {', '.join(unknown)}")
+        sources = {by_name[name]: scraper.rss_sources[by_name[name]] for name in wanted}
+    
+    if args.shards > 1:
+        cycle = lambda: run_sharded_cycle(scraper, args.shards, args.local_workers, args.shard_dir)
+    elif args.once:
+        cycle = lambda: scraper.run_scraping_cycle(sources, include_api=not args.no_api)
+    elif SCHEDULER_MODE == 'adaptive':
+        run_adaptive_scheduler(scraper)
+        return EXIT_OK
+    else:
+        cycle = scraper.run_scraping_cycle
+    
+    if args.once:
+        return run_once(cycle, scraper)
+    
     print("🎯 Running initial hybrid news scraping...")
-    scraper.run_scraping_cycle()
+    cycle()
     
-    schedule.every(2).hours.do(scraper.run_scraping_cycle)
+    schedule.every(2).hours.do(cycle)
     
     print("\n⏰ Scheduler started - News will update every 2 hours")
     print("Press Ctrl+C to stop")
@@ -479,6 +3032,7 @@ def main():
             time.sleep(60)
     except KeyboardInterrupt:
         print("\n🛑 Scheduler stopped")
+    return EXIT_OK
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
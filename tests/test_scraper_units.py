@@ -0,0 +1,142 @@
+import itertools
+import time
+
+import pytest
+
+import test_news
+from test_news import KeywordMatcher, NearDuplicateIndex, ShardLeases, TopArticles
+
+
+def article(title, url, score):
+    return {'title': title, 'summary': '', 'full_content': '', 'url': url, 'perplexity_score': score}
+
+
+def test_top_articles_replaces_duplicate_with_higher_score():
+    top = TopArticles(NearDuplicateIndex(), limit=5)
+    assert top.offer(article("OpenAI launches enterprise agents for sales teams", "https://a.example/1", 5))
+    assert top.offer(article("OpenAI launches enterprise agents for sales teams", "https://b.example/1", 7))
+    assert not top.offer(article("OpenAI launches enterprise agents for sales teams", "https://c.example/1", 6))
+    assert [a['url'] for a in top.results()] == ["https://b.example/1"]
+
+
+class FixedSignatureIndex(NearDuplicateIndex):
+    """Index with hand-made title signatures, so overlaps between stories are exact"""
+    
+    SIGNATURES = {
+        'H': tuple(range(32)),
+        'X': tuple(range(20)) + tuple(range(100, 112)),  # 20/32 shared with H
+        'Z': tuple(range(200, 212)) + tuple(range(12, 32)),  # 20/32 with H, 8/32 with X
+    }
+    
+    def signatures(self, article):
+        return self.SIGNATURES[article['title']], None
+
+
+def test_top_articles_keeps_story_whose_earlier_copy_is_displaced(tmp_path):
+    index = FixedSignatureIndex(str(tmp_path / 'articles.db'), history_hours=24)
+    top = TopArticles(index)
+    top.offer(article('H', "https://a.example/h", 8))
+    index.persist()
+    
+    # Next cycle: X repeats H's story, and H's own copy loses to Z, which doesn't match X
+    cycle = [article('X', "https://a.example/x", 7), article('H', "https://a.example/h", 8),
+             article('Z', "https://a.example/z", 9)]
+    for order in itertools.permutations(cycle):
+        index.reset()
+        top = TopArticles(index)
+        for item in order:
+            top.offer(dict(item))
+        assert [a['url'] for a in top.results()] == ["https://a.example/z", "https://a.example/x"]
+
+
+def test_top_articles_duplicate_of_evicted_article():
+    top = TopArticles(NearDuplicateIndex(), limit=2)
+    top.offer(article("Stripe expands billing platform to new markets", "https://a.example/stripe", 3))
+    top.offer(article("Nvidia reports record data center revenue", "https://a.example/nvidia", 8))
+    top.offer(article("Salesforce acquires data startup in cloud push", "https://a.example/salesforce", 9))
+    assert [a['url'] for a in top.results()] == ["https://a.example/salesforce", "https://a.example/nvidia"]
+    
+    # A weaker copy of the evicted story stays out
+    assert not top.offer(article("Stripe expands billing platform to new markets", "https://b.example/stripe", 2))
+    assert len(top.results()) == 2
+    
+    # A stronger copy takes its place and pushes out the weakest held article
+    assert top.offer(article("Stripe expands billing platform to new markets", "https://c.example/stripe", 10))
+    assert [a['url'] for a in top.results()] == ["https://c.example/stripe", "https://a.example/salesforce"]
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher({'ai': 3, 'startup': 2}, relevant=['ai', 'startup'], unwanted=['sale'])
+
+
+def test_keywords_match_whole_words_only(matcher):
+    assert matcher.analyze("He said the deal was done") == (1, False)
+
+
+def test_keywords_match_plurals_of_relevant_terms(matcher):
+    assert matcher.analyze("AI startups raise new rounds") == (5, True)
+
+
+def test_unwanted_keyword_does_not_fire_inside_other_words(matcher):
+    assert matcher.analyze("AI reshapes wholesale distribution") == (3, True)
+
+
+def test_unwanted_keyword_is_not_pluralized(matcher):
+    assert matcher.analyze("Sales teams adopt AI assistants") == (3, True)
+    assert matcher.analyze("AI gadgets on sale this weekend") == (3, False)
+
+
+def test_shard_lease_can_be_claimed_again_after_it_expires(tmp_path):
+    leases = ShardLeases(str(tmp_path / 'leases.db'))
+    leases.create_cycle('c1', 1)
+    
+    assert leases.claim('worker-a', 0.2, 'c1') == ('c1', 0, 1)
+    assert leases.claim('worker-b', 60, 'c1') is None
+    time.sleep(0.3)
+    assert leases.claim('worker-b', 60, 'c1') == ('c1', 0, 1)
+
+
+def test_completed_shard_is_not_claimed_again(tmp_path):
+    leases = ShardLeases(str(tmp_path / 'leases.db'))
+    leases.create_cycle('c1', 1)
+    
+    leases.claim('worker-a', 0, 'c1')
+    leases.complete('c1', 0)
+    assert leases.claim('worker-b', 60, 'c1') is None
+    assert leases.pending('c1') == 0
+
+
+def test_released_shard_is_given_up_after_max_attempts(tmp_path):
+    leases = ShardLeases(str(tmp_path / 'leases.db'))
+    leases.create_cycle('c1', 1)
+    
+    for _ in range(test_news.SHARD_MAX_ATTEMPTS):
+        assert leases.claim('worker-a', 60, 'c1') is not None
+        leases.release('c1', 0)
+    assert leases.claim('worker-a', 60, 'c1') is None
+    assert leases.failed('c1') == [0]
+
+
+
+def test_history_query_rejects_unparseable_dates():
+    assert test_news.history_query_args({'since': '2025-10-01'})['since'] is not None
+    with pytest.raises(ValueError):
+        test_news.history_query_args({'since': 'garbage'})
+    with pytest.raises(ValueError):
+        test_news.history_query_args({'until': 'next tuesday'})
+
+
+def test_earlier_cycle_copy_only_counts_when_it_is_in_this_cycle(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / 'articles.db'), history_hours=24)
+    title = "Stripe expands billing platform to new markets"
+    earlier = article(title, "https://a.example/stripe", 8)
+    index.add("https://a.example/stripe", *index.signatures(earlier), 8)
+    index.persist()
+    
+    index.reset()
+    signatures = index.signatures(article(title, "https://b.example/stripe", 7))
+    assert index.find_duplicate("https://b.example/stripe", *signatures) is None
+    
+    copy = index.add("https://a.example/stripe", *index.signatures(earlier), 8)
+    assert index.find_duplicate("https://b.example/stripe", *signatures) is copy